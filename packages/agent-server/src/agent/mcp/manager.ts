@@ -10,6 +10,10 @@ interface ConnectedMcp {
     config: McpServerConfig;
 }
 
+// Matches the MCP SDK's default request timeout. Sent to the servers as
+// _meta.timeoutMs so they stop work we are no longer waiting for.
+const MCP_TOOL_TIMEOUT_MS = Number(process.env.MCP_TOOL_TIMEOUT_MS) || 60000;
+
 interface ToolContext {
     userId?: string;
     userIp?: string;
@@ -196,8 +200,8 @@ export class McpManager {
                             const result = await client.callTool({
                                 name: mcpTool.name,
                                 arguments: args,
-                                _meta: meta,
-                            });
+                                _meta: { ...meta, timeoutMs: MCP_TOOL_TIMEOUT_MS },
+                            }, undefined, { timeout: MCP_TOOL_TIMEOUT_MS });
 
                             if (result.isError) {
                                 console.error(`[MCP] Tool execution error: ${mcpTool.name}`);
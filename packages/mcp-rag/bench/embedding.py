@@ -0,0 +1,184 @@
+"""
+Embedding runtime benchmark: speed and retrieval quality per configuration.
+
+For every configuration (model variant and ONNX Runtime thread counts) it
+measures model load time, ingest throughput over the chunks of a markdown
+corpus, single-query latency and batched query throughput, and retrieval
+quality on that corpus:
+
+- section_hit@k: share of queries for which a chunk of the expected section
+  is among the top k. Queries are the corpus' section headings (FAQ
+  questions, glossary terms, ...) unless --queries gives a file of
+  "query<TAB>source<TAB>section" lines.
+- recall@k: overlap of the top k with the first configuration's top k, i.e.
+  how much of the reference ranking a cheaper configuration preserves.
+
+    python -m bench.embedding                                  # ../../rag, fp32 vs int8
+    python -m bench.embedding --configs fp32:1:1,fp32:4:1,int8:1:1,int8:4:1 -k 5 --json
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from glob import glob
+
+import numpy as np
+
+from src.chunker import chunk_markdown
+from src.embedding import EMBED_MODEL_DIR, LocalEmbeddingFunction
+
+DEFAULT_DOCS = os.path.join(os.path.dirname(__file__), "..", "..", "..", "rag")
+
+
+def _parse_config(spec: str) -> tuple[str, int, int]:
+    """variant[:intra_op_threads[:inter_op_threads]]"""
+    parts = spec.split(":")
+    if len(parts) > 3:
+        raise argparse.ArgumentTypeError(f"Invalid configuration '{spec}'")
+    variant = parts[0]
+    intra = int(parts[1]) if len(parts) > 1 and parts[1] else 0
+    inter = int(parts[2]) if len(parts) > 2 and parts[2] else 0
+    return variant, intra, inter
+
+
+def _load_corpus(docs: str) -> tuple[list[str], list[tuple[str, str]]]:
+    texts, keys = [], []
+    for path in sorted(glob(os.path.join(docs, "*.md"))):
+        with open(path, "r", encoding="utf-8") as fh:
+            for chunk in chunk_markdown(fh.read(), source=os.path.basename(path)):
+                texts.append(chunk.text)
+                keys.append((chunk.metadata["source"], chunk.metadata["section"]))
+    return texts, keys
+
+
+def _load_queries(path: str | None, keys: list[tuple[str, str]]) -> list[tuple[str, tuple[str, str]]]:
+    if path:
+        queries = []
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    query, source, section = line.rstrip("\n").split("\t")
+                    queries.append((query, (source, section)))
+        return queries
+    # One query per distinct section heading
+    return [(section, (source, section)) for source, section in dict.fromkeys(keys) if section]
+
+
+def _top_k(query_vectors: np.ndarray, chunk_vectors: np.ndarray, k: int) -> np.ndarray:
+    # Vectors are L2-normalized, so the dot product is the cosine similarity
+    scores = query_vectors @ chunk_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def _ms(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+    }
+
+
+def _bench_config(config: tuple[str, int, int], model_dir: str, texts: list[str], queries: list[str],
+                  batch_size: int) -> tuple[dict, np.ndarray, np.ndarray]:
+    variant, intra, inter = config
+    fn = LocalEmbeddingFunction(variant, intra, inter, model_dir)
+    fn.load()
+    # One warm-up call so session initialization is not counted as throughput
+    fn(texts[:1])
+
+    start = time.perf_counter()
+    chunk_vectors = np.concatenate([np.asarray(fn(texts[i:i + batch_size])) for i in range(0, len(texts), batch_size)])
+    ingest_s = time.perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        t0 = time.perf_counter()
+        fn([query])
+        latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    query_vectors = np.concatenate([np.asarray(fn(queries[i:i + batch_size])) for i in range(0, len(queries), batch_size)])
+    batch_s = time.perf_counter() - start
+
+    report = {
+        "model": fn.model_id,
+        "intra_op_threads": intra,
+        "inter_op_threads": inter,
+        "load_ms": fn.load_ms,
+        "ingest_embeddings_per_s": round(len(texts) / ingest_s, 1),
+        "query_latency": _ms(latencies),
+        "batched_queries_per_s": round(len(queries) / batch_s, 1),
+    }
+    return report, chunk_vectors, query_vectors
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DEFAULT_DOCS, help="Markdown corpus (default: the repo's rag/)")
+    parser.add_argument("--configs", default="fp32,int8",
+                        help="Comma-separated variant[:intra_threads[:inter_threads]]; the first is the recall reference")
+    parser.add_argument("--queries", help="File of query<TAB>source<TAB>section lines (default: section headings)")
+    parser.add_argument("-k", type=int, default=5, help="Cut-off for recall and section hits (default 5)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--model-dir", default=EMBED_MODEL_DIR, help="Model directory (default: EMBED_MODEL_DIR)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    configs = [_parse_config(spec) for spec in args.configs.split(",") if spec]
+    texts, keys = _load_corpus(args.docs)
+    if not texts:
+        parser.error(f"No markdown chunks found in {args.docs}")
+    queries = _load_queries(args.queries, keys)
+    query_texts = [q for q, _ in queries]
+
+    results = []
+    reference = None
+    for config in configs:
+        # Model loading logs with print(); keep stdout for the report
+        with redirect_stdout(sys.stderr):
+            report, chunk_vectors, query_vectors = _bench_config(config, args.model_dir, texts, query_texts, args.batch_size)
+        top = _top_k(query_vectors, chunk_vectors, args.k)
+        hits = [any(keys[i] == expected for i in row) for row, (_, expected) in zip(top, queries)]
+        report[f"section_hit@{args.k}"] = round(sum(hits) / len(hits), 4)
+        if reference is None:
+            reference = top
+        report[f"recall@{args.k}"] = round(
+            statistics.fmean(len(set(row) & set(ref)) / args.k for row, ref in zip(top, reference)), 4
+        )
+        results.append(report)
+
+    output = {
+        "corpus": {"docs": os.path.abspath(args.docs), "chunks": len(texts), "queries": len(queries)},
+        "k": args.k,
+        "configs": results,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    if args.json:
+        print(json.dumps(output, indent=2))
+        return 0
+
+    print(f"\nCorpus: {len(texts)} chunks, {len(queries)} queries, k={args.k} "
+          f"(recall against {results[0]['model']} {configs[0][1]}:{configs[0][2]})")
+    header = f"{'model':<26}{'threads':>8}{'load ms':>10}{'ingest/s':>10}{'q p50 ms':>10}{'q/s batch':>11}{'hit@k':>8}{'recall@k':>10}"
+    print(header)
+    for r in results:
+        print(f"{r['model']:<26}{r['intra_op_threads']:>4}:{r['inter_op_threads']:<3}{r['load_ms']:>10}"
+              f"{r['ingest_embeddings_per_s']:>10}{r['query_latency']['p50_ms']:>10}{r['batched_queries_per_s']:>11}"
+              f"{r[f'section_hit@{args.k}']:>8}{r[f'recall@{args.k}']:>10}")
+    print(f"Peak RSS: {output['peak_rss_mb']} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -40,6 +40,8 @@ def chunk_markdown(
 
     Preserves LaTeX formulas and image references intact.
     Adds overlap between paragraph-split chunks for better retrieval.
+    Each chunk's metadata records its position within its section
+    (part, 1-based, of parts).
     """
     # Remove YAML frontmatter
     text = re.sub(r"^---\n.*?\n---\n", "", text, flags=re.DOTALL)
@@ -64,9 +66,11 @@ def chunk_markdown(
             meta: dict = {"source": source, "section": title}
             if images:
                 meta["images"] = images
+            meta.update(part=1, parts=1)
             embedding_text = _clean_images_for_embedding(section)
             chunks.append(Chunk(text=embedding_text, metadata=meta))
         else:
+            first = len(chunks)
             # Split long sections by double newline (paragraphs)
             paragraphs = re.split(r"\n\n+", section)
             current = ""
@@ -92,5 +96,7 @@ def chunk_markdown(
                     meta["images"] = images
                 embedding_text = _clean_images_for_embedding(current.strip())
                 chunks.append(Chunk(text=embedding_text, metadata=meta))
+            for part, chunk in enumerate(chunks[first:], 1):
+                chunk.metadata.update(part=part, parts=len(chunks) - first)
 
     return chunks
@@ -0,0 +1,269 @@
+"""Local embedding runtime, and micro-batching of query embeddings across concurrent searches."""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+from agentic_shared import admission
+
+# Model variant: fp32 (Chroma's default all-MiniLM-L6-v2) or int8 (dynamically
+# quantized from it on first use; smaller and faster on CPU, slightly less exact)
+EMBED_MODEL = os.environ.get("EMBED_MODEL", "fp32").lower()
+# ONNX Runtime thread pools (0 = onnxruntime's default, one per physical core)
+EMBED_INTRA_OP_THREADS = int(os.environ.get("EMBED_INTRA_OP_THREADS", 0))
+EMBED_INTER_OP_THREADS = int(os.environ.get("EMBED_INTER_OP_THREADS", 0))
+# Load the model at startup instead of on the first ingest or query
+EMBED_PRELOAD = os.environ.get("EMBED_PRELOAD", "true").lower() == "true"
+# Where the model is downloaded (and the int8 variant written); Chroma's cache by default
+EMBED_MODEL_DIR = os.environ.get("EMBED_MODEL_DIR", "")
+# How long the first query of a batch may wait for concurrent searches to submit theirs
+EMBED_BATCH_WINDOW_MS = float(os.environ.get("EMBED_BATCH_WINDOW_MS", 5))
+EMBED_MAX_BATCH = int(os.environ.get("EMBED_MAX_BATCH", 32))
+
+
+MODEL_VARIANTS = ("fp32", "int8")
+
+
+class LocalEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime with explicit runtime settings.
+
+    Unlike Chroma's default embedding function, which builds a new inference
+    session for every call, the session is created once and reused. Batches
+    are padded to their longest input rather than to the 256-token maximum;
+    padding is masked out, so the vectors are the same, but short queries cost
+    a fraction of the compute.
+    """
+
+    def __init__(self, variant: str = "fp32", intra_op_threads: int = 0, inter_op_threads: int = 0,
+                 model_dir: str = ""):
+        if variant not in MODEL_VARIANTS:
+            raise ValueError(f"Unknown embedding model variant '{variant}'. Available: {', '.join(MODEL_VARIANTS)}")
+        super().__init__(preferred_providers=["CPUExecutionProvider"])
+        self.variant = variant
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        if model_dir:
+            self.DOWNLOAD_PATH = Path(model_dir) / self.MODEL_NAME
+        self._load_lock = threading.Lock()
+        self.load_ms: float | None = None
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the vectors this function produces; indexes built with another one are rebuilt."""
+        return f"{self.MODEL_NAME}/{self.variant}"
+
+    def _model_path(self) -> str:
+        folder = os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+        fp32 = os.path.join(folder, "model.onnx")
+        if self.variant == "fp32":
+            return fp32
+        int8 = os.path.join(folder, "model_int8.onnx")
+        if not os.path.exists(int8):
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError as exc:
+                raise ValueError(f"EMBED_MODEL=int8 needs the onnx package: {exc}") from exc
+            print(f"[RAG] Quantizing {fp32} to int8 …", flush=True)
+            tmp = f"{int8}.tmp"
+            quantize_dynamic(fp32, tmp, weight_type=QuantType.QInt8)
+            os.replace(tmp, int8)
+        return int8
+
+    @cached_property
+    def model(self):
+        so = self.ort.SessionOptions()
+        so.log_severity_level = 3
+        so.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads > 0:
+            so.intra_op_num_threads = self.intra_op_threads
+        if self.inter_op_threads > 0:
+            so.inter_op_num_threads = self.inter_op_threads
+            so.execution_mode = self.ort.ExecutionMode.ORT_PARALLEL
+        return self.ort.InferenceSession(self._model_path(), providers=self._preferred_providers, sess_options=so)
+
+    @cached_property
+    def tokenizer(self):
+        tokenizer = self.Tokenizer.from_file(
+            os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "tokenizer.json")
+        )
+        tokenizer.enable_truncation(max_length=self.max_tokens())
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        return tokenizer
+
+    def _forward(self, documents: list[str], batch_size: int = 32) -> np.ndarray:
+        # As in ONNXMiniLM_L6_V2, but tokenizing each batch together so it is
+        # padded to its longest document
+        all_embeddings = []
+        for i in range(0, len(documents), batch_size):
+            encoded = self.tokenizer.encode_batch(documents[i:i + batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            last_hidden_state = self.model.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            })[0]
+            # Mean pooling over the real (unmasked) tokens
+            mask = attention_mask[:, :, np.newaxis].astype(last_hidden_state.dtype)
+            embeddings = (last_hidden_state * mask).sum(1) / np.clip(mask.sum(1), 1e-9, None)
+            all_embeddings.append(self._normalize(embeddings).astype(np.float32))
+        return np.concatenate(all_embeddings) if all_embeddings else np.zeros((0, 384), dtype=np.float32)
+
+    def load(self) -> None:
+        """Download (if needed) and initialize the model and tokenizer."""
+        with self._load_lock:
+            if "model" in self.__dict__:
+                return
+            start = time.perf_counter()
+            self._download_model_if_not_exists()
+            self.tokenizer
+            self.model
+            self.load_ms = round((time.perf_counter() - start) * 1000, 2)
+        print(f"[RAG] Loaded embedding model {self.model_id} in {self.load_ms}ms", flush=True)
+
+    def __call__(self, input):
+        # cached_property is not locked; make sure concurrent first calls build one session
+        if "model" not in self.__dict__:
+            self.load()
+        return super().__call__(input)
+
+    def snapshot(self) -> dict:
+        return {
+            "model": self.model_id,
+            "loaded": "model" in self.__dict__,
+            "load_ms": self.load_ms,
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+        }
+
+
+class _Pending:
+    __slots__ = ("text", "done", "vector", "error")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.done = threading.Event()
+        self.vector = None
+        self.error: BaseException | None = None
+
+
+class _Expected:
+    __slots__ = ("submitted",)
+
+    def __init__(self):
+        self.submitted = False
+
+
+class QueryBatcher:
+    """
+    Embeds queries from concurrent searches in shared batches.
+
+    A single worker thread owns the embedding function. It takes the oldest
+    waiting query and holds the batch open for up to *window_ms*, but only
+    while other searches announced through expect() have yet to submit their
+    query; a search running alone is embedded straight away. Queries that
+    arrive while a batch is being embedded form the next one.
+    """
+
+    def __init__(self, embed_fn, window_ms: float, max_batch: int):
+        self.embed_fn = embed_fn
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self._cond = threading.Condition()
+        self._queue: deque[_Pending] = deque()
+        # Searches in progress that will submit a query shortly
+        self._expected = 0
+        self._worker: threading.Thread | None = None
+        self.stats = {"queries": 0, "batches": 0, "largest_batch": 0, "embed_ms": 0.0}
+
+    @contextmanager
+    def expect(self):
+        """Announce a search that will call embed() shortly, so open batches wait for it."""
+        token = _Expected()
+        with self._cond:
+            self._expected += 1
+        try:
+            yield token
+        finally:
+            if not token.submitted:
+                with self._cond:
+                    self._expected -= 1
+                    self._cond.notify_all()
+
+    def embed(self, text: str, token: _Expected | None = None) -> list[float]:
+        """Embed one query, batched with concurrent ones; honours the current call's deadline."""
+        item = _Pending(text)
+        with self._cond:
+            if token is not None and not token.submitted:
+                token.submitted = True
+                self._expected -= 1
+            self._queue.append(item)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-embedder", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+
+        if not item.done.wait(admission.remaining()):
+            raise admission.DeadlineExceeded("Deadline passed while embedding the query")
+        if item.error is not None:
+            raise item.error
+        return item.vector
+
+    def _next_batch(self) -> list[_Pending]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            close_at = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch and self._expected > 0:
+                left = close_at - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            return [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            start = time.perf_counter()
+            try:
+                vectors = self.embed_fn([item.text for item in batch])
+            except Exception as exc:
+                for item in batch:
+                    item.error = exc
+                    item.done.set()
+                continue
+            for item, vector in zip(batch, vectors):
+                item.vector = vector
+                item.done.set()
+            self.stats["queries"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+            self.stats["embed_ms"] += (time.perf_counter() - start) * 1000
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            waiting = len(self._queue)
+        batches = self.stats["batches"]
+        return dict(
+            self.stats,
+            embed_ms=round(self.stats["embed_ms"], 2),
+            mean_batch=round(self.stats["queries"] / batches, 2) if batches else 0,
+            waiting=waiting,
+            window_ms=self.window * 1000,
+            max_batch=self.max_batch,
+        )
+
+
+# Embeds both the chunks at ingest and the queries, so they always share a model
+embedding_function = LocalEmbeddingFunction(
+    EMBED_MODEL, EMBED_INTRA_OP_THREADS, EMBED_INTER_OP_THREADS, EMBED_MODEL_DIR
+)
+query_batcher = QueryBatcher(embedding_function, EMBED_BATCH_WINDOW_MS, EMBED_MAX_BATCH)
@@ -0,0 +1,378 @@
+"""Knowledge bases: one Chroma collection per docs directory, loaded lazily with LRU eviction."""
+
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from glob import glob
+
+import chromadb
+
+from src.chunker import chunk_markdown
+from src.embedding import embedding_function
+from src.results import Figure
+
+# Bump when chunking or the stored metadata changes, so persisted indexes are rebuilt
+INDEX_VERSION = "3"
+
+# Memory for base64-encoded figures kept across searches (0 = read them from disk every time)
+IMAGE_CACHE_BYTES = int(os.environ.get("IMAGE_CACHE_BYTES", 64 * 1024 * 1024))
+
+# Names become Chroma collection names ("<name>_kb"): [a-zA-Z0-9._-], alphanumeric at both ends
+_KB_NAME_RE = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9._-]{0,56}[a-zA-Z0-9]$")
+
+
+@dataclass(frozen=True)
+class LoadedIndex:
+    """
+    A resident knowledge base. Callers keep their reference even if it is evicted meanwhile.
+
+    The index owns the Chroma client it was opened with. The client is closed
+    once the index is no longer referenced, i.e. after eviction and after the
+    last call using it has finished.
+    """
+
+    collection: object
+    # (source, section, has_images) of every indexed chunk; filters are resolved
+    # against it so the Chroma query gets exact values and a correct n_results
+    catalog: list[tuple[str, str, bool]]
+
+
+class ImageCache:
+    """
+    Figures by path, base64-encoded once and shared by every response that includes them.
+
+    Entries are checked against the file's size and mtime on each lookup, so an
+    edited figure is reread. The least recently used entries are evicted once
+    the total passes *max_bytes*. Figures larger than the budget are not cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[tuple[int, int], Figure]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, path: str) -> Figure | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        version = (st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+
+        with open(path, "rb") as f:
+            figure = Figure(mimetypes.guess_type(path)[0] or "image/png", base64.b64encode(f.read()))
+        if len(figure.data) > self.max_bytes:
+            return figure
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= len(old[1].data)
+            self._entries[path] = (version, figure)
+            self._bytes += len(figure.data)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data)
+                self.stats["evictions"] += 1
+        return figure
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+image_cache = ImageCache(IMAGE_CACHE_BYTES)
+
+
+def _disk_bytes(directory: str) -> int:
+    """Size of the files under *directory*; the persisted HNSW index is loaded into memory whole."""
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _close_client(client) -> None:
+    # Chroma refcounts clients per path; the last one closed releases the
+    # sqlite connection and the HNSW segments
+    client.close()
+
+
+def docs_fingerprint(directory: str) -> str:
+    """Hash of the markdown files' names, sizes and mtimes (plus INDEX_VERSION and the embedding model)."""
+    digest = hashlib.sha1(f"{INDEX_VERSION}:{embedding_function.model_id}".encode())
+    for path in sorted(glob(os.path.join(directory, "*.md"))):
+        st = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+class KnowledgeBase:
+    """One docs directory and its collection, with ingest state and usage counters."""
+
+    def __init__(self, name: str, data_dir: str, collection_name: str, db_dir: str):
+        self.name = name
+        self.data_dir = data_dir
+        self.collection_name = collection_name
+        # Chroma persistence directory; a separate one per knowledge base lets
+        # an evicted one close its client and release its memory
+        self.db_dir = db_dir
+        self.index: LoadedIndex | None = None
+        # On-disk size of the index when it was loaded, charged against the registry's byte budget
+        self.resident_bytes = 0
+        # Serializes loading so concurrent first queries index only once
+        self.lock = threading.Lock()
+        self.state = "unloaded"
+        self.error: str | None = None
+        self.ingest: dict = {}
+        self.stats = {"loads": 0, "evictions": 0, "queries": 0}
+        self.last_used: float | None = None
+
+    def load(self) -> LoadedIndex:
+        """Open the persisted collection, re-ingesting the docs if they changed since it was built."""
+        self.state = "loading"
+        start = time.perf_counter()
+        client = None
+        try:
+            client = chromadb.PersistentClient(path=self.db_dir)
+            if not os.path.isdir(self.data_dir):
+                print(f"[RAG] WARNING: data dir {self.data_dir} does not exist", flush=True)
+                fingerprint = None
+            else:
+                fingerprint = docs_fingerprint(self.data_dir)
+
+            try:
+                coll = client.get_collection(self.collection_name)
+            except Exception:
+                coll = None
+
+            if coll is not None and fingerprint is not None and (coll.metadata or {}).get("fingerprint") == fingerprint:
+                stored = coll.get(include=["metadatas"])["metadatas"]
+                catalog = [(m["source"], m["section"], m["has_images"]) for m in stored]
+                self.ingest = {
+                    "reindexed": False,
+                    "files": len({c[0] for c in catalog}),
+                    "chunks": len(catalog),
+                }
+                print(f"[RAG] {self.name}: reusing index ({len(catalog)} chunks)", flush=True)
+            elif fingerprint is None:
+                coll = client.get_or_create_collection(name=self.collection_name, metadata={"hnsw:space": "cosine"})
+                catalog = []
+                self.ingest = {"reindexed": False, "files": 0, "chunks": 0}
+            else:
+                print(f"[RAG] {self.name}: indexing {self.data_dir} …", flush=True)
+                result = self.reindex(client, fingerprint)
+                coll, catalog = result["collection"], result["catalog"]
+                self.ingest = {"reindexed": True, "files": result["files"], "chunks": result["chunks"]}
+                print(f"[RAG] {self.name}: indexed {result['files']} files, {result['chunks']} chunks", flush=True)
+                for d in result["details"]:
+                    print(f"[RAG]   {d['file']}: {d['chunks']} chunks", flush=True)
+        except Exception as exc:
+            if client is not None:
+                _close_client(client)
+            self.state = "error"
+            self.error = str(exc)
+            raise
+
+        self.ingest["loaded_at"] = time.time()
+        self.ingest["load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.index = LoadedIndex(coll, catalog)
+        weakref.finalize(self.index, _close_client, client)
+        self.resident_bytes = _disk_bytes(self.db_dir)
+        self.state = "ready"
+        self.error = None
+        self.stats["loads"] += 1
+        return self.index
+
+    def reindex(self, client, fingerprint: str) -> dict:
+        """Drop the collection and re-ingest every *.md file from the docs directory."""
+        try:
+            client.delete_collection(self.collection_name)
+        except Exception:
+            pass
+
+        coll = client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine", "fingerprint": fingerprint},
+        )
+
+        md_files = sorted(glob(os.path.join(self.data_dir, "*.md")))
+        total_chunks = 0
+        ingested: list[dict] = []
+        catalog: list[tuple[str, str, bool]] = []
+
+        for filepath in md_files:
+            filename = os.path.basename(filepath)
+            with open(filepath, "r", encoding="utf-8") as fh:
+                content = fh.read()
+
+            chunks = chunk_markdown(content, source=filename)
+            if not chunks:
+                continue
+
+            ids = [f"{filename}:{i}" for i in range(len(chunks))]
+            documents = [c.text for c in chunks]
+            # has_images is stored explicitly so it can be filtered on in the query;
+            # prev_id/next_id link the chunks in document order ("" at either end),
+            # so a hit's context can be fetched by ID
+            metadatas = [
+                dict(
+                    c.metadata,
+                    has_images=bool(c.metadata.get("images")),
+                    prev_id=ids[i - 1] if i > 0 else "",
+                    next_id=ids[i + 1] if i + 1 < len(ids) else "",
+                )
+                for i, c in enumerate(chunks)
+            ]
+
+            # Embedded here rather than by Chroma, with the same runtime as the queries
+            coll.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embedding_function(documents))
+            catalog.extend((m["source"], m["section"], m["has_images"]) for m in metadatas)
+            total_chunks += len(chunks)
+            ingested.append({"file": filename, "chunks": len(chunks)})
+
+        return {
+            "collection": coll,
+            "catalog": catalog,
+            "files": len(ingested),
+            "chunks": total_chunks,
+            "details": ingested,
+        }
+
+    def unload(self) -> None:
+        # Its client closes when the calls still holding the index finish
+        self.index = None
+        self.resident_bytes = 0
+        self.state = "unloaded"
+        self.stats["evictions"] += 1
+
+    def load_image(self, filename: str) -> Figure | None:
+        """Load an image from the docs' pic/ folder by filename, through the image cache."""
+        return image_cache.get(os.path.join(self.data_dir, "pic", filename))
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "data_dir": self.data_dir,
+            "collection": self.collection_name,
+            "db_dir": self.db_dir,
+            "resident_bytes": self.resident_bytes,
+            "ingest": self.ingest,
+            "error": self.error,
+            "last_used": self.last_used,
+            **self.stats,
+        }
+
+
+def discover(kb_root: str) -> dict[str, str]:
+    """Map each subdirectory of *kb_root* with a valid name to its path."""
+    found: dict[str, str] = {}
+    for entry in sorted(os.scandir(kb_root), key=lambda e: e.name):
+        if not entry.is_dir() or entry.name.startswith("."):
+            continue
+        if not _KB_NAME_RE.match(entry.name):
+            print(f"[RAG] WARNING: skipping {entry.path}: not a valid knowledge base name", flush=True)
+            continue
+        found[entry.name] = entry.path
+    return found
+
+
+class KnowledgeBaseRegistry:
+    """
+    Knowledge bases by name, opened on first use.
+
+    At most *max_resident* are kept loaded, and with *max_bytes* set, only as
+    many as fit in that many bytes of index (the one just opened always
+    stays). Opening another evicts the least recently used ones. An evicted
+    knowledge base closes its Chroma client, which frees its memory, and is
+    reopened from the persisted collection (without re-embedding) the next
+    time it is queried.
+    """
+
+    def __init__(self, kbs: dict[str, KnowledgeBase], default: str, max_resident: int, max_bytes: int = 0):
+        self.kbs = kbs
+        self.default = default
+        self.max_resident = max(1, max_resident)
+        self.max_bytes = max_bytes
+        self._resident: OrderedDict[str, KnowledgeBase] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        return list(self.kbs)
+
+    def get(self, name: str | None = None) -> KnowledgeBase:
+        kb = self.kbs.get(name or self.default)
+        if kb is None:
+            raise ValueError(f"Unknown knowledge base '{name}'. Available: {', '.join(self.kbs)}")
+        return kb
+
+    def open(self, name: str | None = None) -> tuple[KnowledgeBase, LoadedIndex]:
+        """Return the knowledge base and its loaded index, loading it if needed (blocking)."""
+        kb = self.get(name)
+        evicted = []
+        while True:
+            with kb.lock:
+                index = kb.index or kb.load()
+            with self._lock:
+                # A concurrent open may have evicted and unloaded it since; load it again
+                if kb.index is not index:
+                    continue
+                self._resident[kb.name] = kb
+                self._resident.move_to_end(kb.name)
+                while len(self._resident) > self.max_resident or (
+                    self.max_bytes and len(self._resident) > 1
+                    and sum(r.resident_bytes for r in self._resident.values()) > self.max_bytes
+                ):
+                    _, old = self._resident.popitem(last=False)
+                    evicted.append(old)
+                break
+
+        # Lock order is always a knowledge base's lock, then the registry's.
+        # Unloading under both keeps every resident knowledge base loaded.
+        for old in evicted:
+            with old.lock, self._lock:
+                # Skip it if it was opened again, or already unloaded by another eviction
+                if old.name in self._resident or old.index is None:
+                    continue
+                old.unload()
+            print(f"[RAG] Evicted knowledge base {old.name}", flush=True)
+
+        kb.last_used = time.time()
+        kb.stats["queries"] += 1
+        return kb, index
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            resident = list(self._resident)
+            resident_bytes = sum(kb.resident_bytes for kb in self._resident.values())
+        return {
+            "default": self.default,
+            "max_resident": self.max_resident,
+            "max_bytes": self.max_bytes,
+            "resident": resident,
+            "resident_bytes": resident_bytes,
+            "knowledge_bases": {name: kb.snapshot() for name, kb in self.kbs.items()},
+        }
@@ -0,0 +1,86 @@
+"""
+Compact tool results and their JSON-RPC encoding.
+
+Search results are kept as slotted records until the response is written.
+They are not turned into dicts and strings first. The figures stay as the
+base64 buffers held by the image cache. The encoded body is a list of byte
+chunks that references those buffers, so a response holds one copy of each
+image whatever transport it goes out on.
+"""
+
+from dataclasses import dataclass
+
+from agentic_shared import jsonrpc
+from mcp.types import ImageContent, TextContent
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """One search hit. orjson serializes it as a dict, so nothing converts it in between."""
+
+    rank: int
+    source: str
+    section: str
+    # Position of the chunk within its section: part (1-based) of parts
+    part: int
+    parts: int
+    relevance: float
+    content: str
+
+
+@dataclass(slots=True)
+class Neighbour:
+    """A chunk next to a hit in its document, attached when the search asks to expand hits."""
+
+    section: str
+    part: int
+    parts: int
+    content: str
+
+
+@dataclass(slots=True)
+class ExpandedHit(SearchHit):
+    """A search hit with the chunks before and after it, in document order."""
+
+    before: list[Neighbour]
+    after: list[Neighbour]
+
+
+@dataclass(slots=True, frozen=True)
+class Figure:
+    """An image as base64-encoded ASCII bytes, shared by every response that includes it."""
+
+    mime: str
+    data: bytes
+
+
+class ToolResult:
+    """A tool's JSON payload (sent as one text item) plus the figures sent as image items after it."""
+
+    __slots__ = ("payload", "figures")
+
+    def __init__(self, payload: dict, figures: list[Figure] | None = None):
+        self.payload = payload
+        self.figures = figures or []
+
+    def encode(self) -> list[bytes]:
+        """The MCP result object ({"content": [...]}) as JSON chunks, figures included by reference."""
+        # The text item's value is the payload's JSON, itself encoded as a JSON string
+        text = jsonrpc.dumps(jsonrpc.dumps_text(self.payload))
+        chunks = [b'{"content":[{"type":"text","text":' + text + b"}"]
+        for figure in self.figures:
+            # base64 needs no escaping inside a JSON string
+            chunks.append(b',{"type":"image","mimeType":' + jsonrpc.dumps(figure.mime) + b',"data":"')
+            chunks.append(figure.data)
+            chunks.append(b'"}')
+        chunks.append(b"]}")
+        return chunks
+
+    def to_content(self) -> list[TextContent | ImageContent]:
+        """MCP SDK content items, for the SDK transport (/sse), which does its own encoding."""
+        content: list[TextContent | ImageContent] = [TextContent(type="text", text=jsonrpc.dumps_text(self.payload))]
+        content.extend(
+            ImageContent(type="image", data=figure.data.decode("ascii"), mimeType=figure.mime)
+            for figure in self.figures
+        )
+        return content
@@ -2,28 +2,33 @@
 """
 MCP RAG Server - Semantic search over Unicity knowledge base.
 
-Read-only vector search via ChromaDB. Reindexes from the data directory
-on every startup, so the admin workflow is:
+Read-only vector search via ChromaDB. A knowledge base is reindexed when it
+is opened and its markdown files (names, sizes, mtimes) or the embedding
+model changed since the persisted index was built; otherwise the index is
+reused. The admin workflow is:
   1. Edit / add / remove markdown files in the mounted docs folder
   2. docker compose restart mcp-rag
 """
 
-import base64
+import asyncio
 import json
-import mimetypes
 import os
-from glob import glob
 
 from mcp.server import Server
+from mcp.server.sse import SseServerTransport
 from mcp.types import Tool, TextContent, ImageContent
 from starlette.applications import Starlette
-from starlette.routing import Route
+from starlette.routing import Route, Mount
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response, StreamingResponse
 import uvicorn
-import chromadb
 
-from src.chunker import chunk_markdown
+from agentic_shared import admission, jsonrpc, profiling, progress
+from agentic_shared.jsonrpc import JSONRPCChunkedResponse, JSONRPCResponse
+
+from src.embedding import EMBED_PRELOAD, embedding_function, query_batcher
+from src.knowledge_bases import KnowledgeBase, KnowledgeBaseRegistry, discover, image_cache
+from src.results import ExpandedHit, Figure, Neighbour, SearchHit, ToolResult
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -32,101 +37,79 @@ DATA_DIR = os.environ.get("DATA_DIR", "/data/docs")
 DB_DIR = os.environ.get("DB_DIR", "/data/chromadb")
 COLLECTION_NAME = "unicity_kb"
 
-# ---------------------------------------------------------------------------
-# ChromaDB setup
-# ---------------------------------------------------------------------------
-chroma_client = chromadb.PersistentClient(path=DB_DIR)
+# Multi-KB mode: every subdirectory of KB_ROOT is a knowledge base named after it
+KB_ROOT = os.environ.get("KB_ROOT", "")
+DEFAULT_KB = os.environ.get("DEFAULT_KB", "unicity")
+# Knowledge bases kept loaded at once; the least recently used is evicted
+KB_MAX_RESIDENT = int(os.environ.get("KB_MAX_RESIDENT", 4))
+# Tool calls running at once and queued (MCP_MAX_CONCURRENT_CALLS / MCP_MAX_QUEUED_CALLS
+# override); searches are CPU-bound embedding and vector work, so fewer run together
+admission.configure(max_concurrent=4, max_queued=16)
+
+# Optional byte budget for resident knowledge bases, measured by the size of
+# their persisted indexes (0 = only KB_MAX_RESIDENT applies)
+KB_MEMORY_LIMIT_BYTES = int(os.environ.get("KB_MEMORY_LIMIT_BYTES", 0))
+
+
+def _build_registry() -> KnowledgeBaseRegistry:
+    if KB_ROOT:
+        dirs = discover(KB_ROOT) if os.path.isdir(KB_ROOT) else {}
+        # One Chroma directory per knowledge base, so an evicted one can be closed
+        kbs = {
+            name: KnowledgeBase(name, path, f"{name}_kb", os.path.join(DB_DIR, name))
+            for name, path in dirs.items()
+        }
+        if not kbs:
+            print(f"[RAG] WARNING: no knowledge bases found in {KB_ROOT}", flush=True)
+    else:
+        # Single-KB mode: DATA_DIR, under its historical collection name and DB_DIR
+        kbs = {DEFAULT_KB: KnowledgeBase(DEFAULT_KB, DATA_DIR, COLLECTION_NAME, DB_DIR)}
+    default = DEFAULT_KB if DEFAULT_KB in kbs or not kbs else next(iter(kbs))
+    return KnowledgeBaseRegistry(kbs, default, KB_MAX_RESIDENT, KB_MEMORY_LIMIT_BYTES)
+
+
+registry = _build_registry()
 
 # ---------------------------------------------------------------------------
 # MCP server
 # ---------------------------------------------------------------------------
 mcp_server = Server("rag")
 
-# ---------------------------------------------------------------------------
-# Image loading
-# ---------------------------------------------------------------------------
-
-def _load_image(filename: str) -> tuple[str, str] | None:
-    """Load an image by filename. Returns (base64_data, mimeType) or None."""
-    filepath = os.path.join(DATA_DIR, "pic", filename)
-    if not os.path.isfile(filepath):
-        return None
-
-    mime = mimetypes.guess_type(filepath)[0] or "image/png"
-    with open(filepath, "rb") as f:
-        data = base64.b64encode(f.read()).decode("ascii")
-    return data, mime
-
-
-# ---------------------------------------------------------------------------
-# Ingestion (runs once at startup)
-# ---------------------------------------------------------------------------
-
-def reindex(directory: str) -> dict:
-    """Drop the collection and re-ingest every *.md file from *directory*."""
-    try:
-        chroma_client.delete_collection(COLLECTION_NAME)
-    except Exception:
-        pass
-
-    coll = chroma_client.get_or_create_collection(
-        name=COLLECTION_NAME,
-        metadata={"hnsw:space": "cosine"},
-    )
-
-    md_files = sorted(glob(os.path.join(directory, "*.md")))
-    total_chunks = 0
-    ingested: list[dict] = []
-
-    for filepath in md_files:
-        filename = os.path.basename(filepath)
-        with open(filepath, "r", encoding="utf-8") as fh:
-            content = fh.read()
-
-        chunks = chunk_markdown(content, source=filename)
-        if not chunks:
-            continue
-
-        ids = [f"{filename}:{i}" for i in range(len(chunks))]
-        documents = [c.text for c in chunks]
-        metadatas = [c.metadata for c in chunks]
-
-        coll.add(ids=ids, documents=documents, metadatas=metadatas)
-        total_chunks += len(chunks)
-        ingested.append({"file": filename, "chunks": len(chunks)})
+# Set DEBUG_MCP=true to log tool arguments
+DEBUG_MCP = os.environ.get("DEBUG_MCP", "false").lower() == "true"
 
-    return {"collection": coll, "files": len(ingested), "chunks": total_chunks, "details": ingested}
+# Most neighbouring chunks unicity_search attaches on each side of a hit
+MAX_EXPAND = 2
 
 
 def startup_ingest():
-    """Reindex docs directory on every startup."""
-    global collection
-    if not os.path.isdir(DATA_DIR):
-        print(f"[RAG] WARNING: data dir {DATA_DIR} does not exist", flush=True)
-        collection = chroma_client.get_or_create_collection(
-            name=COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"},
-        )
-        return
-
-    print(f"[RAG] Indexing {DATA_DIR} …", flush=True)
-    result = reindex(DATA_DIR)
-    collection = result["collection"]
-    print(f"[RAG] Indexed {result['files']} files, {result['chunks']} chunks", flush=True)
-    for d in result["details"]:
-        print(f"[RAG]   {d['file']}: {d['chunks']} chunks", flush=True)
-
-
-# will be set by startup_ingest()
-collection = None  # type: ignore[assignment]
+    """Load the embedding model and the default knowledge base up front; the others load on first use."""
+    if EMBED_PRELOAD:
+        embedding_function.load()
+    if registry.kbs:
+        registry.open()
 
 
 # ---------------------------------------------------------------------------
 # Tool definitions (read-only)
 # ---------------------------------------------------------------------------
 
+def _kb_properties() -> dict:
+    """Schema for the kb argument; only offered when more than one knowledge base is served."""
+    if len(registry.kbs) < 2:
+        return {}
+    return {
+        "kb": {
+            "type": "string",
+            "enum": registry.names(),
+            "description": f"Knowledge base to use (default: {registry.default})",
+        }
+    }
+
+
 @mcp_server.list_tools()
 async def list_tools() -> list[Tool]:
+    kb_properties = _kb_properties()
     return [
         Tool(
             name="unicity_search",
@@ -151,6 +134,32 @@ async def list_tools() -> list[Tool]:
                         "maximum": 10,
                         "default": 4,
                     },
+                    "source": {
+                        "type": "string",
+                        "description": (
+                            "Only search this document, e.g. FAQ.md or Unicity-Glossary.md "
+                            "(see list_documents; the .md extension is optional)"
+                        ),
+                    },
+                    "section_prefix": {
+                        "type": "string",
+                        "description": "Only search sections whose heading starts with this text (case-insensitive)",
+                    },
+                    "has_images": {
+                        "type": "boolean",
+                        "description": "true: only chunks with figures; false: only chunks without",
+                    },
+                    "expand": {
+                        "type": "integer",
+                        "description": (
+                            "Also return up to this many neighbouring chunks before and after each hit, "
+                            "for more surrounding context (0-2)"
+                        ),
+                        "minimum": 0,
+                        "maximum": MAX_EXPAND,
+                        "default": 0,
+                    },
+                    **kb_properties,
                 },
                 "required": ["query"],
             },
@@ -158,7 +167,7 @@ async def list_tools() -> list[Tool]:
         Tool(
             name="list_documents",
             description="List all documents currently in the Unicity knowledge base.",
-            inputSchema={"type": "object", "properties": {}},
+            inputSchema={"type": "object", "properties": kb_properties},
         ),
     ]
 
@@ -169,50 +178,181 @@ async def list_tools() -> list[Tool]:
 
 @mcp_server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent | ImageContent]:
+    # Calls through the SDK transport (/sse) carry _meta in the request context
+    # and report progress on the MCP session
+    meta = {}
+    try:
+        request_meta = mcp_server.request_context.meta
+        if request_meta is not None:
+            meta = request_meta.model_dump()
+    except LookupError:
+        pass
+    reporter = progress.session_reporter(mcp_server)
+    if reporter is not None:
+        with progress.reporting_to(reporter):
+            result = await admitted_call(name, arguments, meta)
+    else:
+        result = await admitted_call(name, arguments, meta)
+    return result.to_content()
+
+
+async def admitted_call(name: str, arguments: dict, meta: dict) -> ToolResult:
+    """Run a tool call through admission control, under the deadline and priority in *meta*."""
+    with profiling.trace_call(name, arguments):
+        async with admission.admitted(meta):
+            profiling.mark_stage("Admitted")
+            return await run_tool(name, arguments)
+
+
+async def run_tool(name: str, arguments: dict) -> ToolResult:
     try:
+        # Chroma calls block, so run them off the event loop
         if name == "unicity_search":
-            return _tool_search(arguments)
+            return await asyncio.to_thread(_tool_search, arguments)
         elif name == "list_documents":
-            return _tool_list()
+            return await asyncio.to_thread(_tool_list, arguments or {})
         else:
             raise ValueError(f"Unknown tool: {name}")
 
+    except (admission.DeadlineExceeded, asyncio.TimeoutError):
+        # Answered as a deadline error (-32001), not as a failed tool result
+        raise
     except Exception as exc:
         import traceback
         traceback.print_exc()
-        return [TextContent(type="text", text=json.dumps({"error": str(exc), "tool": name}))]
-
-
-def _text(obj: dict) -> list[TextContent]:
-    return [TextContent(type="text", text=json.dumps(obj, ensure_ascii=False))]
-
-
-def _tool_search(args: dict) -> list[TextContent | ImageContent]:
+        return ToolResult({"error": str(exc), "tool": name})
+
+
+def _search_filter(args: dict, catalog: list[tuple[str, str, bool]]) -> tuple[dict | None, int]:
+    """
+    Build the Chroma where clause for the search filters.
+
+    Returns the clause (None when unfiltered) and the number of chunks it
+    matches. Source names and section prefixes are resolved to exact values
+    from the knowledge base's catalog, so Chroma restricts the vector search to the matching
+    chunks instead of post-filtering.
+    """
+    source = args.get("source")
+    prefix = (args.get("section_prefix") or "").strip().casefold()
+    has_images = args.get("has_images")
+
+    matching = catalog
+    clauses: list[dict] = []
+    if source:
+        wanted = source.strip().casefold()
+        sources = {s for s, _, _ in catalog if s.casefold() in (wanted, f"{wanted}.md")}
+        if not sources:
+            known = sorted({s for s, _, _ in catalog})
+            raise ValueError(f"Unknown source '{source}'. Available: {', '.join(known)}")
+        matching = [c for c in matching if c[0] in sources]
+        clauses.append({"source": {"$in": sorted(sources)}})
+    if prefix:
+        matching = [c for c in matching if c[1].casefold().startswith(prefix)]
+        clauses.append({"section": {"$in": sorted({c[1] for c in matching})}})
+    if has_images is not None:
+        matching = [c for c in matching if c[2] == bool(has_images)]
+        clauses.append({"has_images": bool(has_images)})
+
+    if not clauses:
+        return None, len(catalog)
+    return (clauses[0] if len(clauses) == 1 else {"$and": clauses}), len(matching)
+
+
+def _neighbours(collection, hit_ids: list[str], metadatas: list[dict], depth: int):
+    """
+    The chunks before and after each hit, up to *depth* on each side, in document order.
+
+    Neighbours are found through the prev_id/next_id links stored at ingest and
+    fetched by ID, one lookup per level, without further vector queries. A side
+    stops at the document's edge or at a chunk that is already in the results
+    (a hit, or a neighbour of a better-ranked hit), so no text is sent twice.
+    """
+    claimed = set(hit_ids)
+    fetched: dict[str, tuple[str, dict]] = {}
+    # Outermost chunk reached on each side of every hit; None once a side stops
+    edges = [[meta, meta] for meta in metadatas]
+    before: list[list[Neighbour]] = [[] for _ in hit_ids]
+    after: list[list[Neighbour]] = [[] for _ in hit_ids]
+
+    for _ in range(depth):
+        wanted = {
+            edge[key] for pair in edges for edge, key in zip(pair, ("prev_id", "next_id"))
+            if edge is not None and edge.get(key) and edge[key] not in claimed and edge[key] not in fetched
+        }
+        if wanted:
+            got = collection.get(ids=sorted(wanted), include=["documents", "metadatas"])
+            fetched.update(zip(got["ids"], zip(got["documents"], got["metadatas"])))
+        for i, pair in enumerate(edges):
+            for side, key, out in ((0, "prev_id", before[i]), (1, "next_id", after[i])):
+                edge = pair[side]
+                neighbour_id = edge.get(key) if edge is not None else None
+                if not neighbour_id or neighbour_id in claimed or neighbour_id not in fetched:
+                    pair[side] = None
+                    continue
+                claimed.add(neighbour_id)
+                doc, meta = fetched[neighbour_id]
+                neighbour = Neighbour(meta.get("section", ""), meta.get("part", 1), meta.get("parts", 1), doc)
+                if side == 0:
+                    out.insert(0, neighbour)
+                else:
+                    out.append(neighbour)
+                pair[side] = meta
+    return before, after
+
+
+def _open_kb(name: str | None):
+    """Open a knowledge base for a tool call, reporting progress if it has to be loaded first."""
+    kb = registry.get(name)
+    if kb.index is None:
+        progress.report_progress(0, 3, f"Loading knowledge base {kb.name}")
+    return registry.open(kb.name)
+
+
+def _tool_search(args: dict) -> ToolResult:
+    # Announced up front so a batch closing while this search opens its
+    # knowledge base waits for its query instead of leaving it for the next one
+    with query_batcher.expect() as pending_query:
+        return _search(args, pending_query)
+
+
+def _search(args: dict, pending_query) -> ToolResult:
     query = args["query"]
-    n = min(args.get("n_results", 5), collection.count() or 1)
-
-    results = collection.query(query_texts=[query], n_results=n)
+    kb, index = _open_kb(args.get("kb"))
+    where, available = _search_filter(args, index.catalog)
+    if where is not None and available == 0:
+        return ToolResult({"results": [], "message": "No chunks match the given filters."})
+    n = min(args.get("n_results", 5), available or 1)
+    expand = max(0, min(int(args.get("expand") or 0), MAX_EXPAND))
+
+    admission.check_deadline()
+    progress.report_progress(0, 3, "Searching knowledge base")
+    embedding = query_batcher.embed(query, pending_query)
+    profiling.mark_stage("Embedded query")
+    results = index.collection.query(query_embeddings=[embedding], n_results=n, where=where)
 
     if not results["documents"] or not results["documents"][0]:
-        return _text({"results": [], "message": "No results found."})
+        return ToolResult({"results": [], "message": "No results found."})
 
-    formatted = []
-    seen_images: set[str] = set()
-    image_items: list[ImageContent] = []
-
-    for i, (doc, meta, dist) in enumerate(
-        zip(results["documents"][0], results["metadatas"][0], results["distances"][0])
-    ):
-        formatted.append(
-            {
-                "rank": i + 1,
-                "source": meta.get("source", ""),
-                "section": meta.get("section", ""),
-                "relevance": round(1 - dist, 3),
-                "content": doc,
-            }
-        )
+    metadatas = results["metadatas"][0]
+    fields = [
+        (i + 1, meta.get("source", ""), meta.get("section", ""), meta.get("part", 1), meta.get("parts", 1),
+         round(1 - dist, 3), doc)
+        for i, (doc, meta, dist) in enumerate(zip(results["documents"][0], metadatas, results["distances"][0]))
+    ]
+    if expand:
+        admission.check_deadline()
+        before, after = _neighbours(index.collection, results["ids"][0], metadatas, expand)
+        profiling.mark_stage("Expanded hits")
+        hits = [ExpandedHit(*f, before=b, after=a) for f, b, a in zip(fields, before, after)]
+    else:
+        hits = [SearchHit(*f) for f in fields]
+    # Text hits are ready before the (slower) figure loading
+    progress.report_progress(1, 3, f"Found {len(hits)} chunks", partial={"results": hits})
+    admission.check_deadline()
 
+    seen_images: set[str] = set()
+    figures: list[Figure] = []
+    for meta in metadatas:
         # Collect image refs from metadata
         images_str = meta.get("images", "")
         if images_str:
@@ -220,102 +360,289 @@ def _tool_search(args: dict) -> list[TextContent | ImageContent]:
                 img_name = img_name.strip()
                 if img_name and img_name not in seen_images:
                     seen_images.add(img_name)
-                    loaded = _load_image(img_name)
-                    if loaded:
-                        b64_data, mime = loaded
-                        image_items.append(
-                            ImageContent(type="image", data=b64_data, mimeType=mime)
-                        )
+                    figure = kb.load_image(img_name)
+                    if figure:
+                        figures.append(figure)
 
-    content: list[TextContent | ImageContent] = _text({"results": formatted})
-    content.extend(image_items)
-    return content
+    progress.report_progress(2, 3, f"Loaded {len(figures)} figures")
+    return ToolResult({"results": hits}, figures)
 
 
-def _tool_list() -> list[TextContent]:
-    all_meta = collection.get()
+def _tool_list(args: dict) -> ToolResult:
+    kb, index = _open_kb(args.get("kb"))
     sources: dict[str, int] = {}
-    for meta in all_meta["metadatas"]:
-        src = meta.get("source", "unknown")
+    for src, _, _ in index.catalog:
         sources[src] = sources.get(src, 0) + 1
 
     docs = [{"source": s, "chunks": c} for s, c in sorted(sources.items())]
-    return _text({"documents": docs, "total_chunks": collection.count()})
+    return ToolResult({"kb": kb.name, "documents": docs, "total_chunks": len(index.catalog)})
 
 
 # ---------------------------------------------------------------------------
 # HTTP / JSON-RPC transport  (mirrors mcp-web-py)
 # ---------------------------------------------------------------------------
 
-def _serialize_content_item(r) -> dict:
-    """Serialize a TextContent or ImageContent to JSON-RPC dict."""
-    if r.type == "image":
-        return {"type": "image", "data": r.data, "mimeType": r.mimeType}
-    return {"type": "text", "text": r.text}
-
-
-async def handle_messages(request: Request):
-    """POST /mcp – MCP protocol over HTTP (JSON-RPC 2.0)."""
-    body = None
+# Static JSON-RPC results, serialized once
+INITIALIZE_RESULT = jsonrpc.dumps({
+    "protocolVersion": "2024-11-05",
+    "capabilities": {"tools": {}},
+    "serverInfo": {"name": "rag", "version": "1.0.0"},
+})
+_tools_list_result: bytes | None = None
+
+# Maximum tool calls from JSON-RPC batches executing at once
+MCP_BATCH_CONCURRENCY = int(os.environ.get("MCP_BATCH_CONCURRENCY", 4))
+_batch_limit = asyncio.Semaphore(MCP_BATCH_CONCURRENCY)
+
+
+async def _tools_list() -> bytes:
+    global _tools_list_result
+    if _tools_list_result is None:
+        tools = await list_tools()
+        _tools_list_result = jsonrpc.dumps({
+            "tools": [
+                {"name": t.name, "description": t.description, "inputSchema": t.inputSchema}
+                for t in tools
+            ]
+        })
+    return _tools_list_result
+
+
+async def dispatch_message(body, meta_defaults: dict | None = None) -> tuple[bytes | list[bytes] | None, int]:
+    """
+    Handle one JSON-RPC message; returns (serialized response or None, HTTP status).
+
+    Tool results are serialized as a list of chunks (see ToolResult.encode)
+    so figures are written from the image cache's buffers without copying.
+
+    meta_defaults holds _meta values from the HTTP headers; the message's own
+    _meta takes precedence.
+    """
+    request_id = body.get("id") if isinstance(body, dict) else None
     try:
-        body = await request.json()
+        if not isinstance(body, dict):
+            return jsonrpc.error_body(None, -32600, "Invalid Request"), 400
+
         method = body.get("method")
-        params = body.get("params", {})
-        request_id = body.get("id")
+        params = body.get("params") or {}
 
         print(f"[MCP] {method} (id={request_id})", flush=True)
 
         def ok(result):
-            return JSONResponse({"jsonrpc": "2.0", "id": request_id, "result": result})
+            return jsonrpc.result_body(request_id, result), 200
 
         def err(code: int, msg: str):
-            return JSONResponse(
-                {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": msg}},
-                status_code=400,
-            )
+            return jsonrpc.error_body(request_id, code, msg), 400
 
         if method == "initialize":
-            return ok({
-                "protocolVersion": "2024-11-05",
-                "capabilities": {"tools": {}},
-                "serverInfo": {"name": "rag", "version": "1.0.0"},
-            })
+            return ok(INITIALIZE_RESULT)
 
         if method == "notifications/initialized":
-            return JSONResponse({})
+            return None, 200
 
         if method == "ping":
-            return ok({})
+            return ok(b"{}")
 
         if method == "tools/list":
-            tools = await list_tools()
-            return ok({
-                "tools": [
-                    {"name": t.name, "description": t.description, "inputSchema": t.inputSchema}
-                    for t in tools
-                ]
-            })
+            return ok(await _tools_list())
 
         if method == "tools/call":
             tool_name = params.get("name")
             arguments = params.get("arguments", {})
             print(f"[MCP] Calling tool: {tool_name}", flush=True)
-            result = await call_tool(tool_name, arguments)
-            return ok({"content": [_serialize_content_item(r) for r in result]})
+            if DEBUG_MCP:
+                print(f"[MCP] Arguments: {json.dumps(arguments)[:300]}", flush=True)
+            meta = {**(meta_defaults or {}), **(params.get("_meta") or {})}
+            try:
+                result = await admitted_call(tool_name, arguments, meta)
+            except admission.Overloaded as exc:
+                print(f"[MCP] Shed {tool_name}: {exc}", flush=True)
+                return jsonrpc.error_body(request_id, -32000, f"Server overloaded: {exc}"), 503
+            except (admission.DeadlineExceeded, asyncio.TimeoutError) as exc:
+                print(f"[MCP] {tool_name}: {exc}", flush=True)
+                return jsonrpc.error_body(request_id, -32001, str(exc) or "Deadline exceeded"), 504
+            except ValueError as exc:
+                return err(-32602, f"Invalid params: {exc}")
+            return jsonrpc.result_chunks(request_id, result.encode()), 200
 
         return err(-32601, f"Method not found: {method}")
 
     except Exception as exc:
         import traceback
         traceback.print_exc()
-        try:
-            return JSONResponse(
-                {"jsonrpc": "2.0", "id": body.get("id") if body else None,
-                 "error": {"code": -32603, "message": str(exc)}},
-                status_code=500,
-            )
-        except Exception:
-            return JSONResponse({"error": str(exc)}, status_code=500)
+        return jsonrpc.error_body(request_id, -32603, str(exc)), 500
+
+
+async def _dispatch_batch_item(message, meta_defaults: dict) -> bytes | list[bytes] | None:
+    async with _batch_limit:
+        response, _ = await dispatch_message(message, meta_defaults)
+    # Requests without an id are notifications and get no response
+    if isinstance(message, dict) and "id" not in message:
+        return None
+    return response
+
+
+async def handle_messages(request: Request):
+    """POST /mcp – MCP protocol over HTTP (JSON-RPC 2.0, including batches)."""
+    try:
+        body = jsonrpc.loads(await request.body())
+    except jsonrpc.JSONDecodeError as exc:
+        return JSONRPCResponse(jsonrpc.error_body(None, -32700, f"Parse error: {exc}"), status_code=400)
+
+    meta_defaults = admission.request_meta(request.headers)
+
+    if isinstance(body, list):
+        if not body:
+            return JSONRPCResponse(jsonrpc.error_body(None, -32600, "Invalid Request: empty batch"), status_code=400)
+        print(f"[MCP] batch of {len(body)} messages", flush=True)
+        # Concurrent, bounded by MCP_BATCH_CONCURRENCY; gather keeps request order
+        responses = await asyncio.gather(*(_dispatch_batch_item(m, meta_defaults) for m in body))
+        parts = [r for r in responses if r is not None]
+        if not parts:
+            return Response(status_code=202)
+        chunks = [b"["]
+        for i, part in enumerate(parts):
+            if i:
+                chunks.append(b",")
+            chunks.extend(jsonrpc.body_chunks(part))
+        chunks.append(b"]")
+        return JSONRPCChunkedResponse(chunks)
+
+    progress_token = _progress_token(body)
+    if progress_token is not None and "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_tool_call(body, progress_token, meta_defaults),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    response, status_code = await dispatch_message(body, meta_defaults)
+    if response is None:
+        return JSONRPCResponse(b"{}")
+    if isinstance(response, list):
+        return JSONRPCChunkedResponse(response, status_code=status_code)
+    return JSONRPCResponse(response, status_code=status_code)
+
+
+def _progress_token(body):
+    """progressToken of a tools/call request that asked for progress, else None."""
+    if not isinstance(body, dict) or body.get("method") != "tools/call":
+        return None
+    meta = (body.get("params") or {}).get("_meta") or {}
+    return meta.get("progressToken")
+
+
+def _sse_event(payload: bytes) -> bytes:
+    return b"event: message\ndata: " + payload + b"\n\n"
+
+
+async def _stream_tool_call(body: dict, progress_token, meta_defaults: dict):
+    """Streamable HTTP response: progress notifications as they happen, then the result."""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run():
+        with progress.reporting_to(progress.queue_reporter(queue, progress_token)):
+            return await dispatch_message(body, meta_defaults)
+
+    task = asyncio.create_task(run())
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield _sse_event(jsonrpc.dumps(getter.result()))
+            else:
+                getter.cancel()
+        while not queue.empty():
+            yield _sse_event(jsonrpc.dumps(queue.get_nowait()))
+        response, _ = task.result()
+        # The result's chunks go out one by one, inside a single event
+        yield b"event: message\ndata: "
+        for chunk in jsonrpc.body_chunks(response):
+            yield chunk
+        yield b"\n\n"
+    finally:
+        # Client went away: stop the tool call
+        if not task.done():
+            task.cancel()
+
+
+async def handle_metrics(request: Request):
+    """GET /metrics – admission control and tool-call counters."""
+    return JSONRPCResponse({
+        "knowledge_bases": registry.snapshot(),
+        "admission": admission.controller.snapshot(),
+        "embedding": embedding_function.snapshot(),
+        "query_embedding": query_batcher.snapshot(),
+        "image_cache": image_cache.snapshot(),
+        "tool_calls": dict(profiling.call_stats, slow_threshold_ms=profiling.SLOW_CALL_MS),
+    })
+
+
+def _debug_denied(request: Request) -> Response | None:
+    """Debug routes need PROFILE_TOKEN as a bearer token; without one configured they do not exist."""
+    if not profiling.PROFILE_TOKEN:
+        return JSONRPCResponse({"error": "Not found"}, status_code=404)
+    if not profiling.authorized(request.headers.get("authorization", "")):
+        return JSONRPCResponse({"error": "Unauthorized"}, status_code=401,
+                               headers={"WWW-Authenticate": "Bearer"})
+    return None
+
+
+async def handle_profile(request: Request):
+    """GET /debug/profile – profile the live process (seconds, format, interval_ms, idle)."""
+    denied = _debug_denied(request)
+    if denied is not None:
+        return denied
+
+    query = request.query_params
+    try:
+        seconds = float(query.get("seconds", 10))
+        interval_ms = float(query.get("interval_ms", 5))
+    except ValueError:
+        return JSONRPCResponse({"error": "seconds and interval_ms must be numbers"}, status_code=400)
+    if not 0 < seconds <= profiling.PROFILE_MAX_SECONDS or not 1 <= interval_ms <= 1000:
+        return JSONRPCResponse({
+            "error": f"seconds must be in (0, {profiling.PROFILE_MAX_SECONDS}] and interval_ms in [1, 1000]"
+        }, status_code=400)
+    format = query.get("format", "collapsed")
+    if format not in ("collapsed", "pstats"):
+        return JSONRPCResponse({"error": "format must be collapsed or pstats"}, status_code=400)
+
+    try:
+        data = await profiling.run_profile(
+            seconds, format, interval_ms / 1000, query.get("idle", "false").lower() == "true"
+        )
+    except profiling.ProfilerBusy as e:
+        return JSONRPCResponse({"error": str(e)}, status_code=409)
+
+    if format == "pstats":
+        return Response(data, media_type="application/octet-stream",
+                        headers={"Content-Disposition": 'attachment; filename="mcp-rag.pstats"'})
+    return Response(data, media_type="text/plain; charset=utf-8")
+
+
+async def handle_slow_calls(request: Request):
+    """GET /debug/slow-calls – recent tool calls over SLOW_CALL_MS with stage timings."""
+    denied = _debug_denied(request)
+    if denied is not None:
+        return denied
+    return JSONRPCResponse({
+        "threshold_ms": profiling.SLOW_CALL_MS,
+        "stats": profiling.call_stats,
+        "calls": list(profiling.slow_calls),
+    })
+
+
+# MCP SDK SSE transport: GET /sse, then POST /messages/?session_id=...
+sse_transport = SseServerTransport("/messages/")
+
+
+async def handle_sse(request: Request):
+    """GET /sse – MCP over Server-Sent Events via the SDK transport."""
+    async with sse_transport.connect_sse(request.scope, request.receive, request._send) as streams:
+        await mcp_server.run(streams[0], streams[1], mcp_server.create_initialization_options())
+    return Response()
 
 
 # ---------------------------------------------------------------------------
@@ -324,7 +651,14 @@ async def handle_messages(request: Request):
 
 app = Starlette(
     debug=True,
-    routes=[Route("/mcp", handle_messages, methods=["POST"])],
+    routes=[
+        Route("/mcp", handle_messages, methods=["POST"]),
+        Route("/sse", handle_sse, methods=["GET"]),
+        Mount("/messages/", app=sse_transport.handle_post_message),
+        Route("/metrics", handle_metrics, methods=["GET"]),
+        Route("/debug/profile", handle_profile, methods=["GET"]),
+        Route("/debug/slow-calls", handle_slow_calls, methods=["GET"]),
+    ],
 )
 
 
@@ -332,12 +666,17 @@ def main():
     port = int(os.environ.get("PORT", 3003))
 
     print(f"Starting MCP RAG Server on port {port} …", flush=True)
-    print(f"  Data dir : {DATA_DIR}", flush=True)
+    if KB_ROOT:
+        print(f"  KB root  : {KB_ROOT} ({', '.join(registry.names()) or 'none'})", flush=True)
+    else:
+        print(f"  Data dir : {DATA_DIR}", flush=True)
     print(f"  DB dir   : {DB_DIR}", flush=True)
 
     startup_ingest()
 
     print(f"  Endpoint : http://0.0.0.0:{port}/mcp", flush=True)
+    if profiling.PROFILE_TOKEN:
+        print(f"  Profiling: http://0.0.0.0:{port}/debug/profile (bearer token required)", flush=True)
     uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
 
 
@@ -0,0 +1,257 @@
+"""Deterministic synthetic web corpus for offline benchmarks.
+
+Writes pages, JSON API responses and search results into a fixture store in
+the same format as WEB_REPLAY_MODE=record, so generated and recorded
+fixtures can be mixed in one store.
+"""
+import json
+import random
+
+from src.services.replay import FixtureStore
+
+
+_SYLLABLES = "ka lo mi ne ru sa ti vo ber con dis ex gra hel in lan mor pre quo ser tra un ver wen".split()
+_CYRILLIC = "ра ло ми не ру са ти во бер кон дис гра хел лан мор пре сер тра вер".split()
+_JAPANESE = "か き く け こ さ し す せ そ た ち つ て と な に ぬ ね の 日 本 語 文 書 情 報".split()
+
+KINDS = ["news", "blog", "docs", "wiki", "forum", "product", "landing", "longform", "foreign", "malformed"]
+
+
+class _Text:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def word(self, syllables=_SYLLABLES) -> str:
+        return "".join(self.rng.choice(syllables) for _ in range(self.rng.randint(1, 3)))
+
+    def sentence(self, syllables=_SYLLABLES, joiner=" ") -> str:
+        words = [self.word(syllables) for _ in range(self.rng.randint(6, 18))]
+        return joiner.join(words).capitalize() + "."
+
+    def paragraph(self, syllables=_SYLLABLES, joiner=" ") -> str:
+        return " ".join(self.sentence(syllables, joiner) for _ in range(self.rng.randint(3, 7)))
+
+    def title(self) -> str:
+        return " ".join(self.word() for _ in range(self.rng.randint(3, 7))).title()
+
+
+def _chrome(t: _Text, body: str, title: str, lang: str = "en", scripts: int = 3) -> str:
+    """Wrap main content in typical navigation, sidebars, scripts and footer."""
+    nav = "".join(f'<li><a href="/{t.word()}">{t.word().title()}</a></li>' for _ in range(t.rng.randint(5, 25)))
+    script = "".join(
+        f"<script>window.__{t.word()}={{a:{t.rng.randint(0, 999)},b:'{t.word()}'}};"
+        f"function {t.word()}(x){{return x*{t.rng.randint(2, 9)}}}</script>"
+        for _ in range(scripts)
+    )
+    footer = "".join(f'<a href="/{t.word()}">{t.word()}</a> ' for _ in range(t.rng.randint(10, 40)))
+    return (
+        f'<!DOCTYPE html><html lang="{lang}"><head><meta charset="utf-8"><title>{title}</title>'
+        f'<meta name="author" content="{t.word().title()} {t.word().title()}">'
+        f"<style>body{{font-family:sans-serif}}.nav{{display:flex}}</style>{script}</head>"
+        f'<body><header><nav class="nav"><ul>{nav}</ul></nav></header>{body}'
+        f'<footer><p>{footer}</p><p>&copy; {t.word()}</p></footer></body></html>'
+    )
+
+
+def _page(kind: str, t: _Text) -> str:
+    title = t.title()
+    rng = t.rng
+    if kind == "news":
+        paras = "".join(f"<p>{t.paragraph()}</p>" for _ in range(rng.randint(6, 20)))
+        related = "".join(f'<li><a href="/{t.word()}">{t.title()}</a></li>' for _ in range(8))
+        body = (f'<main><article><h1>{title}</h1><p class="byline">By {t.word().title()}</p>{paras}</article>'
+                f'<aside><h3>Related</h3><ul>{related}</ul></aside></main>')
+    elif kind == "blog":
+        paras = "".join(f"<h2>{t.title()}</h2><p>{t.paragraph()}</p><p>{t.paragraph()}</p>" for _ in range(rng.randint(3, 8)))
+        comments = "".join(
+            f'<div class="comment"><span class="user">{t.word()}</span><p>{t.sentence()}</p></div>'
+            for _ in range(rng.randint(0, 30))
+        )
+        body = f'<div id="content"><article><h1>{title}</h1>{paras}</article><section id="comments">{comments}</section></div>'
+    elif kind == "docs":
+        sections = "".join(
+            f"<h2>{t.title()}</h2><p>{t.paragraph()}</p>"
+            f"<pre><code>def {t.word()}({t.word()}):\n    return {t.word()} * {rng.randint(1, 99)}\n</code></pre>"
+            f"<table><tr><th>Name</th><th>Type</th><th>Description</th></tr>"
+            + "".join(f"<tr><td>{t.word()}</td><td>str</td><td>{t.sentence()}</td></tr>" for _ in range(rng.randint(2, 8)))
+            + "</table>"
+            for _ in range(rng.randint(3, 10))
+        )
+        sidebar = "".join(f'<li><a href="#{t.word()}">{t.title()}</a></li>' for _ in range(30))
+        body = f'<div class="docs"><nav class="sidebar"><ul>{sidebar}</ul></nav><main><h1>{title}</h1>{sections}</main></div>'
+    elif kind == "wiki":
+        infobox = "".join(f"<tr><th>{t.word()}</th><td>{t.word()} {rng.randint(1, 2000)}</td></tr>" for _ in range(10))
+        paras = "".join(
+            f'<p>{t.paragraph()} <a href="/wiki/{t.word()}">{t.word()}</a> {t.paragraph()}<sup>[{i}]</sup></p>'
+            for i in range(rng.randint(8, 25))
+        )
+        refs = "".join(f"<li>{t.sentence()}</li>" for _ in range(15))
+        body = (f'<div id="bodyContent"><h1>{title}</h1><table class="infobox">{infobox}</table>{paras}'
+                f'<h2>References</h2><ol class="references">{refs}</ol></div>')
+    elif kind == "forum":
+        posts = "".join(
+            f'<div class="post"><div class="author">{t.word()}<br>Posts: {rng.randint(1, 9000)}</div>'
+            f'<div class="message"><p>{t.paragraph()}</p></div></div>'
+            for _ in range(rng.randint(5, 40))
+        )
+        body = f'<div class="thread"><h1>{title}</h1>{posts}</div>'
+    elif kind == "product":
+        specs = "".join(f"<tr><td>{t.word()}</td><td>{rng.randint(1, 500)} {t.word()}</td></tr>" for _ in range(12))
+        reviews = "".join(f'<div class="review"><b>{rng.randint(1, 5)}/5</b><p>{t.paragraph()}</p></div>' for _ in range(rng.randint(2, 15)))
+        body = (f'<main><h1>{title}</h1><span class="price">${rng.randint(5, 999)}.99</span>'
+                f"<p>{t.paragraph()}</p><table>{specs}</table><h2>Reviews</h2>{reviews}</main>")
+    elif kind == "landing":
+        cards = "".join(
+            f'<div class="card"><img src="/{t.word()}.png" alt=""><h3>{t.title()}</h3><p>{t.sentence()}</p></div>'
+            for _ in range(rng.randint(6, 24))
+        )
+        body = f'<section class="hero"><h1>{title}</h1><p>{t.sentence()}</p><a class="cta">Start</a></section><section>{cards}</section>'
+        return _chrome(t, body, title, scripts=rng.randint(10, 40))
+    elif kind == "longform":
+        chapters = "".join(
+            f"<h2>{t.title()}</h2>" + "".join(f"<p>{t.paragraph()}</p>" for _ in range(rng.randint(10, 30)))
+            for _ in range(rng.randint(6, 15))
+        )
+        body = f"<main><article><h1>{title}</h1>{chapters}</article></main>"
+    elif kind == "foreign":
+        lang, syllables, joiner = rng.choice([("ru", _CYRILLIC, " "), ("ja", _JAPANESE, ""), ("de", _SYLLABLES, " ")])
+        paras = "".join(f"<p>{t.paragraph(syllables, joiner)}</p>" for _ in range(rng.randint(6, 20)))
+        body = f"<main><article><h1>{t.sentence(syllables, joiner)}</h1>{paras}</article></main>"
+        return _chrome(t, body, title, lang=lang)
+    else:  # malformed: unclosed tags, nested tables, stray markup
+        paras = "".join(f"<p>{t.paragraph()}<div><table><tr><td>{t.sentence()}" for _ in range(rng.randint(5, 15)))
+        body = f"<center><font size=3><h1>{title}<b>{paras}<p>{t.paragraph()}</body>"
+    return _chrome(t, body, title)
+
+
+def _json_document(t: _Text) -> dict:
+    rng = t.rng
+    return {
+        "data": [
+            # amount: token amounts in base units routinely exceed 64 bits
+            {"id": i, "name": t.word(), "score": rng.random(), "amount": rng.getrandbits(96),
+             "tags": [t.word() for _ in range(rng.randint(0, 4))],
+             "meta": {"created": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "active": rng.random() > 0.5}}
+            for i in range(rng.randint(5, 500))
+        ],
+        "page": 1,
+        "total": rng.randint(500, 5000),
+    }
+
+
+def _markdown(t: _Text) -> str:
+    sections = "".join(
+        f"## {t.title()}\n\n{t.paragraph()}\n\n- {t.sentence()}\n- {t.sentence()}\n\n"
+        f"```\n{t.word()} = {t.rng.randint(1, 99)}\n```\n\n"
+        for _ in range(t.rng.randint(3, 12))
+    )
+    return f"# {t.title()}\n\n{t.paragraph()}\n\n{sections}"
+
+
+def _rss(t: _Text, host: str) -> str:
+    items = "".join(
+        f"<item><title>{t.title()}</title><link>https://{host}/{t.word()}-{i}</link>"
+        f"<pubDate>Mon, {t.rng.randint(1, 28):02d} Sep 2025 10:00:00 GMT</pubDate>"
+        f"<description>&lt;p&gt;{t.paragraph()}&lt;/p&gt;</description></item>"
+        for i in range(t.rng.randint(20, 120))
+    )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{t.title()}</title>'
+            f"<link>https://{host}/</link><description>{t.sentence()}</description>{items}</channel></rss>")
+
+
+def _atom(t: _Text, host: str) -> str:
+    entries = "".join(
+        f'<entry><title>{t.title()}</title><link rel="alternate" href="https://{host}/{t.word()}-{i}"/>'
+        f"<updated>2025-09-{t.rng.randint(1, 28):02d}T10:00:00Z</updated>"
+        f'<summary type="html">{t.paragraph()}</summary></entry>'
+        for i in range(t.rng.randint(20, 120))
+    )
+    return (f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>{t.title()}</title><author><name>{t.word().title()}</name></author>{entries}</feed>")
+
+
+def _pdf(t: _Text, pages: int) -> bytes:
+    """A minimal text PDF (Helvetica, one paragraph of lines per page)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        lines = "".join(f"({t.sentence()}) Tj T* " for _ in range(30))
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {lines}ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objects)} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>".encode())
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# Non-HTML documents fetched through the content-type extractors:
+# (kind, count, content type, file extension)
+DOCUMENT_KINDS = [
+    ("text", 10, "text/plain; charset=utf-8", "txt"),
+    ("markdown", 10, "text/markdown; charset=utf-8", "md"),
+    ("rss", 8, "application/rss+xml", "xml"),
+    ("atom", 8, "application/atom+xml", "xml"),
+    ("pdf", 4, "application/pdf", "pdf"),
+]
+
+
+def generate(store: FixtureStore, pages: int = 300, json_docs: int = 20, searches: int = 10, seed: int = 7) -> dict:
+    """Write a corpus into *store*; returns the generated URLs by category."""
+    rng = random.Random(seed)
+    t = _Text(rng)
+    page_urls: list[str] = []
+    for i in range(pages):
+        kind = KINDS[i % len(KINDS)]
+        # One host per page, as in real fetches, so per-host rate limits do not serialize the run
+        url = f"https://{kind}-{i}.bench.example/{t.word()}/{t.word()}"
+        html = _page(kind, t).encode("utf-8")
+        store.save_http("GET", url, b"", 200, "OK", {"Content-Type": "text/html; charset=utf-8"}, html)
+        page_urls.append(url)
+
+    document_urls: list[str] = []
+    for kind, count, content_type, extension in DOCUMENT_KINDS:
+        for i in range(count):
+            host = f"{kind}-{i}.bench.example"
+            if kind == "text":
+                body = "\n\n".join(t.paragraph() for _ in range(rng.randint(5, 40))).encode("utf-8")
+            elif kind == "markdown":
+                body = _markdown(t).encode("utf-8")
+            elif kind == "rss":
+                body = _rss(t, host).encode("utf-8")
+            elif kind == "atom":
+                body = _atom(t, host).encode("utf-8")
+            else:
+                body = _pdf(t, rng.randint(3, 60))
+            url = f"https://{host}/{t.word()}.{extension}"
+            store.save_http("GET", url, b"", 200, "OK", {"Content-Type": content_type}, body)
+            document_urls.append(url)
+
+    json_urls: list[str] = []
+    for i in range(json_docs):
+        url = f"https://api-{i}.bench.example/v1/{t.word()}"
+        body = json.dumps(_json_document(t)).encode("utf-8")
+        store.save_http("GET", url, b"", 200, "OK", {"Content-Type": "application/json"}, body)
+        json_urls.append(url)
+
+    queries: list[str] = []
+    for i in range(searches):
+        query = " ".join(t.word() for _ in range(rng.randint(2, 4)))
+        results = [
+            {"title": t.title(), "href": url, "body": t.sentence()}
+            for url in rng.sample(page_urls, min(10, len(page_urls)))
+        ]
+        store.save_search(query, "wt-wt", "auto", results)
+        queries.append(query)
+
+    return {"pages": page_urls, "documents": document_urls, "json": json_urls, "queries": queries}
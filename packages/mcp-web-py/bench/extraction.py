@@ -0,0 +1,216 @@
+"""
+Extraction throughput benchmark over a replayed web corpus.
+
+Runs fetch end to end (stand-in server, outbound guard, extraction) on HTML
+pages and on the other content types (text, markdown, feeds, PDF), plus each
+HTML extraction stage on its own, json_fetch and search, all in replay mode,
+so it needs no network and gives comparable numbers across runs and machines.
+
+    python -m bench.extraction                      # generate a corpus if the store is empty
+    python -m bench.extraction --store fixtures/web --concurrency 8 --json
+
+Exits non-zero if any replayed call fails, so it can gate CI.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+
+
+def _summary(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "total_s": round(sum(ordered), 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _timed(samples: list[float], fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        samples.append(time.perf_counter() - start)
+
+
+def _bench_stages(bodies: list[str]) -> dict:
+    """Time each extraction step fetch runs, on the raw bodies (no HTTP)."""
+    import html2text
+    import trafilatura
+    from readability import Document
+
+    stages: dict[str, list[float]] = {name: [] for name in (
+        "trafilatura_text", "trafilatura_metadata", "trafilatura_xml", "html2text", "readability")}
+    for html in bodies:
+        _timed(stages["trafilatura_text"], trafilatura.extract, html,
+               include_comments=False, include_tables=True, no_fallback=False)
+        _timed(stages["trafilatura_metadata"], trafilatura.extract_metadata, html)
+        xml = _timed(stages["trafilatura_xml"], trafilatura.extract, html,
+                     include_comments=False, include_tables=True, output_format="xml")
+        h = html2text.HTML2Text()
+        h.body_width = 0
+        _timed(stages["html2text"], h.handle, xml or "")
+        doc = Document(html)
+        _timed(stages["readability"], lambda: (doc.title(), doc.summary()))
+    return {name: _summary(samples) for name, samples in stages.items()}
+
+
+def _bench_fetch(urls: list[str], concurrency: int, format: str) -> dict:
+    from src.services import extractors
+    from src.tools.fetch import FetchInput, fetch_page
+
+    for stats in extractors.extractor_stats.values():
+        stats.update(calls=0, errors=0, total_ms=0.0, max_ms=0.0)
+
+    latencies: list[float] = []
+    errors: list[dict] = []
+    chars = 0
+
+    def one(url: str) -> dict:
+        return _timed(latencies, fetch_page, FetchInput(url=url, format=format, max_length=100000))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for url, result in zip(urls, pool.map(one, urls)):
+            if "error" in result:
+                errors.append({"url": url, "error": result["error"]})
+            else:
+                chars += result["length"]
+    elapsed = time.perf_counter() - start
+    return {
+        "pages": len(urls),
+        "concurrency": concurrency,
+        "format": format,
+        "elapsed_s": round(elapsed, 3),
+        "pages_per_s": round(len(urls) / elapsed, 2) if elapsed else None,
+        "chars_extracted": chars,
+        "latency": _summary(latencies),
+        "extractors": {name: s for name, s in extractors.stats_snapshot().items() if s["calls"]},
+        "errors": errors,
+    }
+
+
+async def _bench_async_tools(json_urls: list[str], queries: list[str]) -> dict:
+    from src.tools.json_fetch import JsonFetchInput, json_fetch_tool
+    from src.tools.search import SearchInput, search_tool
+
+    results = {}
+    for name, calls in (
+        ("json_fetch", [(json_fetch_tool, JsonFetchInput(url=url, path="$.data[*]", limit=50)) for url in json_urls]),
+        ("search", [(search_tool, SearchInput(query=query)) for query in queries]),
+    ):
+        latencies: list[float] = []
+        errors: list[dict] = []
+        for tool, tool_input in calls:
+            start = time.perf_counter()
+            result = await tool(tool_input)
+            latencies.append(time.perf_counter() - start)
+            if "error" in result:
+                errors.append({"input": tool_input.model_dump(mode="json"), "error": result["error"]})
+            elif isinstance(result.get("data"), dict) and "_raw" in result["data"]:
+                # Every recorded JSON document is valid, so the raw fallback is a parser failure
+                errors.append({"input": tool_input.model_dump(mode="json"), "error": "parsed as non-JSON"})
+        results[name] = {"latency": _summary(latencies), "errors": errors}
+    return results
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", help="Fixture store to replay (default: a temporary generated corpus)")
+    parser.add_argument("--generate", type=int, metavar="N", default=None,
+                        help="Write an N-page synthetic corpus into the store first (default 300 if it is empty)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel fetches (default 8)")
+    parser.add_argument("--format", choices=["markdown", "text", "html"], default="markdown")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    store_dir = args.store or tempfile.mkdtemp(prefix="web-bench-")
+    # Must be set before src is imported: the replay module reads them at import time
+    os.environ["WEB_REPLAY_MODE"] = "replay"
+    os.environ["WEB_REPLAY_DIR"] = store_dir
+
+    from bench.corpus import generate
+    from src.services.replay import store
+
+    generated = None
+    if args.generate or not store.http_entries():
+        generated = generate(store, pages=args.generate or 300)
+
+    entries = store.http_entries()
+    pages = [e for e in entries if e["method"] == "GET" and "html" in e["headers"].get("Content-Type", "")]
+    json_docs = [e for e in entries if e["method"] == "GET" and "json" in e["headers"].get("Content-Type", "")]
+    documents = [e for e in entries if e["method"] == "GET" and e not in pages and e not in json_docs]
+    queries = generated["queries"] if generated else []
+    search_dir = os.path.join(store_dir, "search")
+    if not queries and os.path.isdir(search_dir):
+        for name in sorted(os.listdir(search_dir)):
+            with open(os.path.join(search_dir, name), "rb") as f:
+                queries.append(json.loads(f.read())["query"])
+
+    bodies = []
+    for e in pages:
+        _, body = store.load_http(e["key"])
+        bodies.append(body.decode("utf-8", errors="replace"))
+
+    # The tools log with print(); keep stdout for the report
+    with redirect_stdout(sys.stderr):
+        report = {
+            "store": store_dir,
+            "corpus": {"pages": len(pages), "bytes": sum(len(b) for b in bodies), "documents": len(documents),
+                       "json_docs": len(json_docs), "searches": len(queries)},
+            "fetch": _bench_fetch([e["url"] for e in pages], args.concurrency, args.format),
+            "fetch_documents": _bench_fetch([e["url"] for e in documents], args.concurrency, args.format),
+            "stages": _bench_stages(bodies),
+            **asyncio.run(_bench_async_tools([e["url"] for e in json_docs], queries)),
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+    failures = sum(len(report[name]["errors"]) for name in ("fetch", "fetch_documents", "json_fetch", "search"))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        fetch = report["fetch"]
+        print(f"\nCorpus: {report['corpus']['pages']} pages ({report['corpus']['bytes'] / 1e6:.1f} MB), "
+              f"{report['corpus']['json_docs']} JSON docs, {report['corpus']['searches']} searches")
+        print(f"fetch ({fetch['format']}, concurrency {fetch['concurrency']}): "
+              f"{fetch['pages_per_s']} pages/s, p50 {fetch['latency']['p50_ms']}ms, p95 {fetch['latency']['p95_ms']}ms")
+        for name, stats in report["stages"].items():
+            print(f"  {name:<22} mean {stats['mean_ms']:>8}ms  p50 {stats['p50_ms']:>8}ms  p95 {stats['p95_ms']:>8}ms")
+        documents_report = report["fetch_documents"]
+        print(f"fetch, other content types ({report['corpus']['documents']} documents): "
+              f"{documents_report['pages_per_s']} docs/s, p95 {documents_report['latency'].get('p95_ms')}ms")
+        for name, stats in documents_report["extractors"].items():
+            print(f"  {name:<22} {stats['calls']:>4} calls  mean {stats['mean_ms']:>8}ms  max {stats['max_ms']:>8}ms")
+        for name in ("json_fetch", "search"):
+            stats = report[name]["latency"]
+            print(f"{name}: {stats.get('count', 0)} calls, mean {stats.get('mean_ms')}ms, p95 {stats.get('p95_ms')}ms")
+        print(f"Peak RSS: {report['peak_rss_mb']} MB")
+        if failures:
+            print(f"{failures} replayed calls failed:")
+            for name in ("fetch", "fetch_documents", "json_fetch", "search"):
+                for error in report[name]["errors"]:
+                    print(f"  {name}: {error}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,22 +8,56 @@ import json
 import os
 from typing import Any
 from mcp.server import Server
+from mcp.server.sse import SseServerTransport
 from mcp.types import Tool, TextContent
 from starlette.applications import Starlette
-from starlette.routing import Route
+from starlette.routing import Route, Mount
 from starlette.requests import Request
-from starlette.responses import StreamingResponse, JSONResponse
+from starlette.responses import StreamingResponse, JSONResponse, Response
 import uvicorn
 
+from agentic_shared import admission, jsonrpc, profiling, progress
+from agentic_shared.jsonrpc import JSONRPCResponse
+
 # Import our tool implementations
-from src.tools.search import search_tool, SearchInput
+from src.tools.search import search_tool, SearchInput, search_cache
 from src.tools.fetch import fetch_tool, FetchInput
-from src.tools.json_fetch import json_fetch_tool, JsonFetchInput
+from src.tools.fetch_many import fetch_many_tool, FetchManyInput
+from src.tools.fetch_more import fetch_more_tool, FetchMoreInput
+from src.tools.json_fetch import json_fetch_tool, JsonFetchInput, JSON_FETCH_MAX_BYTES
+from src.tools.research import research_tool, ResearchInput
+from src.services.outbound import host_guard
+from src.services.document_store import document_store
+from src.services import extractors
 
 
 # Create MCP server instance
 mcp_server = Server("web")
 
+# Set DEBUG_MCP=true to log request params and tool arguments
+DEBUG_MCP = os.environ.get("DEBUG_MCP", "false").lower() == "true"
+
+# Tool calls running at once and queued (MCP_MAX_CONCURRENT_CALLS / MCP_MAX_QUEUED_CALLS
+# override); fetches mostly wait on the network, so many can run together
+admission.configure(max_concurrent=16, max_queued=32)
+
+# Static JSON-RPC results, serialized once
+INITIALIZE_RESULT = jsonrpc.dumps({
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "web",
+        "version": "1.0.0"
+    }
+})
+_tools_list_result: bytes | None = None
+
+# Maximum tool calls from JSON-RPC batches executing at once across the server
+MCP_BATCH_CONCURRENCY = int(os.environ.get("MCP_BATCH_CONCURRENCY", 8))
+_batch_limit = asyncio.Semaphore(MCP_BATCH_CONCURRENCY)
+
 
 @mcp_server.list_tools()
 async def list_tools() -> list[Tool]:
@@ -64,7 +98,7 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="fetch",
-            description="Fetch and extract clean content from web pages. Uses trafilatura (F1: 0.958) as primary extraction method with readability-lxml as fallback. Returns clean, readable content.",
+            description="Fetch and extract clean content from web pages. Uses trafilatura (F1: 0.958) as primary extraction method with readability-lxml as fallback. Plain text and markdown are returned as is, JSON pretty-printed, RSS/Atom feeds as a list of entries and PDFs as the text of their first pages. Returns clean, readable content. If the page is longer than max_length, the result includes a cursor for fetch_more.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -90,6 +124,123 @@ async def list_tools() -> list[Tool]:
                 "required": ["url"]
             }
         ),
+        Tool(
+            name="fetch_many",
+            description="Fetch and extract clean content from several web pages concurrently. Use this instead of repeated fetch calls when reading multiple search results. Results come back in input order; pages that fail or miss the deadline are reported individually.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "urls": {
+                        "type": "array",
+                        "items": {"type": "string", "format": "uri"},
+                        "description": "URLs to fetch and extract content from",
+                        "minItems": 1,
+                        "maxItems": 20
+                    },
+                    "format": {
+                        "type": "string",
+                        "description": "Output format",
+                        "enum": ["markdown", "html", "text"],
+                        "default": "markdown"
+                    },
+                    "max_length": {
+                        "type": "integer",
+                        "description": "Maximum content length per page in characters",
+                        "minimum": 1,
+                        "maximum": 100000,
+                        "default": 20000
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "Overall deadline in seconds; pages still loading are reported as timed out",
+                        "exclusiveMinimum": 0,
+                        "maximum": 60,
+                        "default": 20
+                    }
+                },
+                "required": ["urls"]
+            }
+        ),
+        Tool(
+            name="fetch_more",
+            description="Continue reading a page that fetch or fetch_many truncated, using the returned cursor. Returns the next slice instantly without refetching, or the slice around the next occurrence of a search term.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor returned by fetch, fetch_many or a previous fetch_more"
+                    },
+                    "max_length": {
+                        "type": "integer",
+                        "description": "Maximum slice length in characters",
+                        "minimum": 1,
+                        "maximum": 100000,
+                        "default": 20000
+                    },
+                    "find": {
+                        "type": "string",
+                        "description": "Optional text to jump to; the slice starts shortly before its next occurrence",
+                        "minLength": 1
+                    }
+                },
+                "required": ["cursor"]
+            }
+        ),
+        Tool(
+            name="research",
+            description="Answer a research question in one step: searches the web, reads the top results concurrently and returns only the passages most relevant to the query, within a size budget. Prefer this over search followed by several fetch calls.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Research question or search query",
+                        "minLength": 1
+                    },
+                    "top_k": {
+                        "type": "integer",
+                        "description": "Number of top search results to read (1-10)",
+                        "minimum": 1,
+                        "maximum": 10,
+                        "default": 5
+                    },
+                    "max_chars": {
+                        "type": "integer",
+                        "description": "Total character budget for returned passages",
+                        "minimum": 500,
+                        "maximum": 30000,
+                        "default": 8000
+                    },
+                    "max_passages": {
+                        "type": "integer",
+                        "description": "Maximum number of passages to return",
+                        "minimum": 1,
+                        "maximum": 30,
+                        "default": 8
+                    },
+                    "region": {
+                        "type": "string",
+                        "description": "Region code (us-en, uk-en, wt-wt for worldwide)",
+                        "enum": ["us-en", "uk-en", "wt-wt"],
+                        "default": "wt-wt"
+                    },
+                    "backend": {
+                        "type": "string",
+                        "description": "Search backend (auto for parallel metasearch, or specific: duckduckgo, bing, brave, google)",
+                        "default": "auto"
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "Deadline in seconds for fetching the result pages",
+                        "exclusiveMinimum": 0,
+                        "maximum": 60,
+                        "default": 15
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
         Tool(
             name="json_fetch",
             description="Fetch JSON data from remote APIs. Supports all HTTP methods and handles non-JSON responses gracefully.",
@@ -110,6 +261,33 @@ async def list_tools() -> list[Tool]:
                     "body": {
                         "type": "string",
                         "description": "Optional request body as JSON string"
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "Optional JSONPath-style projection to return only part of the response, e.g. $.items[*].name or $.data['total']. Use [*] to select every element of an array; indexes like [0] are not supported, so pick elements with [*] plus offset and limit."
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of values matched by path to return (with no path, pages a top-level array)",
+                        "minimum": 1,
+                        "maximum": 1000
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of matched values to skip, for paging",
+                        "minimum": 0,
+                        "default": 0
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": "Maximum response body size in bytes",
+                        "minimum": 1,
+                        "maximum": 20000000
+                    },
+                    "include_headers": {
+                        "type": "boolean",
+                        "description": "Include response headers in the result",
+                        "default": False
                     }
                 },
                 "required": ["url"]
@@ -120,7 +298,32 @@ async def list_tools() -> list[Tool]:
 
 @mcp_server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Handle tool calls"""
+    """Handle tool calls arriving through the SDK transport (/sse)"""
+    meta = {}
+    try:
+        request_meta = mcp_server.request_context.meta
+        if request_meta is not None:
+            meta = request_meta.model_dump()
+    except LookupError:
+        pass
+    # Progress goes to the MCP session
+    reporter = progress.session_reporter(mcp_server)
+    if reporter is not None:
+        with progress.reporting_to(reporter):
+            return await admitted_call(name, arguments, meta)
+    return await admitted_call(name, arguments, meta)
+
+
+async def admitted_call(name: str, arguments: dict, meta: dict) -> list[TextContent]:
+    """Run a tool call through admission control, under the deadline and priority in *meta*."""
+    with profiling.trace_call(name, arguments):
+        async with admission.admitted(meta):
+            profiling.mark_stage("Admitted")
+            return await run_tool(name, arguments)
+
+
+async def run_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Dispatch a tool call to its implementation"""
     try:
         if name == "search":
             # Call search tool
@@ -131,7 +334,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 backend=arguments.get("backend", "auto")
             )
             result = await search_tool(input_data)
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [TextContent(type="text", text=jsonrpc.dumps_text(result))]
 
         elif name == "fetch":
             # Call fetch tool
@@ -141,7 +344,42 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 max_length=arguments.get("max_length", 50000)
             )
             result = await fetch_tool(input_data)
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [TextContent(type="text", text=jsonrpc.dumps_text(result))]
+
+        elif name == "fetch_many":
+            # Call fetch_many tool
+            input_data = FetchManyInput(
+                urls=arguments["urls"],
+                format=arguments.get("format", "markdown"),
+                max_length=arguments.get("max_length", 20000),
+                deadline=arguments.get("deadline", 20.0)
+            )
+            result = await fetch_many_tool(input_data)
+            return [TextContent(type="text", text=jsonrpc.dumps_text(result))]
+
+        elif name == "fetch_more":
+            # Call fetch_more tool
+            input_data = FetchMoreInput(
+                cursor=arguments["cursor"],
+                max_length=arguments.get("max_length", 20000),
+                find=arguments.get("find")
+            )
+            result = await fetch_more_tool(input_data)
+            return [TextContent(type="text", text=jsonrpc.dumps_text(result))]
+
+        elif name == "research":
+            # Call research tool
+            input_data = ResearchInput(
+                query=arguments["query"],
+                top_k=arguments.get("top_k", 5),
+                max_chars=arguments.get("max_chars", 8000),
+                max_passages=arguments.get("max_passages", 8),
+                region=arguments.get("region", "wt-wt"),
+                backend=arguments.get("backend", "auto"),
+                deadline=arguments.get("deadline", 15.0)
+            )
+            result = await research_tool(input_data)
+            return [TextContent(type="text", text=jsonrpc.dumps_text(result))]
 
         elif name == "json_fetch":
             # Call json_fetch tool
@@ -149,14 +387,22 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 url=arguments["url"],
                 method=arguments.get("method", "GET"),
                 headers=arguments.get("headers"),
-                body=arguments.get("body")
+                body=arguments.get("body"),
+                path=arguments.get("path"),
+                limit=arguments.get("limit"),
+                offset=arguments.get("offset", 0),
+                max_bytes=arguments.get("max_bytes", JSON_FETCH_MAX_BYTES),
+                include_headers=arguments.get("include_headers", False)
             )
             result = await json_fetch_tool(input_data)
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [TextContent(type="text", text=jsonrpc.dumps_text(result))]
 
         else:
             raise ValueError(f"Unknown tool: {name}")
 
+    except (admission.DeadlineExceeded, asyncio.TimeoutError):
+        # Answered as a deadline error (-32001), not as a failed tool result
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -165,131 +411,110 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             "tool": name,
             "message": f"Tool execution failed: {str(e)}"
         }
-        return [TextContent(type="text", text=json.dumps(error_result))]
+        return [TextContent(type="text", text=jsonrpc.dumps_text(error_result))]
+
+
+# HTTP Server setup using MCP's SSE transport: clients open GET /sse and post
+# messages to /messages/?session_id=...; responses stream back over the SSE connection
+sse_transport = SseServerTransport("/messages/")
 
 
-# HTTP Server setup using MCP's SSE transport
 async def handle_sse(request: Request):
     """
     Handle SSE endpoint for MCP communication
     This endpoint provides Server-Sent Events transport for MCP protocol
     """
-    from mcp.server.sse import sse_server
-    from mcp import ClientSession
-    from starlette.responses import Response
-
-    async with sse_server() as streams:
+    async with sse_transport.connect_sse(request.scope, request.receive, request._send) as streams:
         read_stream, write_stream = streams
-
-        # Run MCP server
-        init_options = mcp_server.create_initialization_options()
-
-        async def event_generator():
-            """Generate SSE events from MCP server"""
-            async for message in write_stream:
-                yield f"data: {json.dumps(message)}\n\n"
-
-        # Start server task
-        server_task = asyncio.create_task(
-            mcp_server.run(read_stream, write_stream, init_options)
-        )
-
-        try:
-            return StreamingResponse(
-                event_generator(),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
+        await mcp_server.run(read_stream, write_stream, mcp_server.create_initialization_options())
+    return Response()
+
+
+async def tools_list_result() -> bytes:
+    """Serialized tools/list result, built on first use"""
+    global _tools_list_result
+    if _tools_list_result is None:
+        tools = await list_tools()
+        _tools_list_result = jsonrpc.dumps({
+            "tools": [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "inputSchema": tool.inputSchema
                 }
-            )
-        finally:
-            server_task.cancel()
-            try:
-                await server_task
-            except asyncio.CancelledError:
-                pass
+                for tool in tools
+            ]
+        })
+    return _tools_list_result
 
 
-async def handle_messages(request: Request):
-    """Handle POST /mcp endpoint - MCP protocol over HTTP (JSON-RPC 2.0)"""
+async def dispatch_message(body, meta_defaults: dict | None = None) -> tuple[bytes | None, int]:
+    """
+    Handle one JSON-RPC message.
+
+    meta_defaults holds _meta values taken from the HTTP headers (deadline,
+    priority); the message's own _meta takes precedence. Returns the
+    serialized response (None for notifications) and the HTTP status to use
+    when the message was sent on its own.
+    """
+    request_id = body.get("id") if isinstance(body, dict) else None
     try:
-        body = await request.json()
+        if not isinstance(body, dict):
+            return jsonrpc.error_body(None, -32600, "Invalid Request"), 400
+
         method = body.get("method")
-        params = body.get("params", {})
-        request_id = body.get("id")  # JSON-RPC request ID
+        params = body.get("params") or {}
 
         print(f"[MCP] Received method: {method} (id: {request_id})", flush=True)
-        if params:
+        if DEBUG_MCP and params:
             print(f"[MCP] Params: {json.dumps(params, indent=2)[:500]}", flush=True)
 
-        # Helper function to create JSON-RPC response
+        # Helper function to create JSON-RPC response; result may be pre-serialized bytes
         def jsonrpc_response(result):
-            response = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": result
-            }
             print(f"[MCP] Sending response for id {request_id}", flush=True)
-            return JSONResponse(response)
+            return jsonrpc.result_body(request_id, result), 200
 
         def jsonrpc_error(code: int, message: str):
-            response = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": code,
-                    "message": message
-                }
-            }
             print(f"[MCP] Sending error response: {code} - {message}", flush=True)
-            return JSONResponse(response, status_code=400)
+            return jsonrpc.error_body(request_id, code, message), 400
 
         # Handle MCP initialization
         if method == "initialize":
-            return jsonrpc_response({
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
-                "serverInfo": {
-                    "name": "web",
-                    "version": "1.0.0"
-                }
-            })
+            return jsonrpc_response(INITIALIZE_RESULT)
 
         # Handle notifications (no response needed for notifications)
         elif method == "notifications/initialized":
             print("[MCP] Client initialized", flush=True)
             # Notifications don't get responses in JSON-RPC
-            return JSONResponse({})
+            return None, 200
 
         # Handle ping
         elif method == "ping":
-            return jsonrpc_response({})
+            return jsonrpc_response(b"{}")
 
         # Handle tools listing
         elif method == "tools/list":
-            tools = await list_tools()
-            return jsonrpc_response({
-                "tools": [
-                    {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "inputSchema": tool.inputSchema
-                    }
-                    for tool in tools
-                ]
-            })
+            return jsonrpc_response(await tools_list_result())
 
         # Handle tool execution
         elif method == "tools/call":
             tool_name = params.get("name")
             arguments = params.get("arguments", {})
             print(f"[MCP] Calling tool: {tool_name}", flush=True)
-            print(f"[MCP] Arguments: {json.dumps(arguments, indent=2)[:300]}", flush=True)
+            if DEBUG_MCP:
+                print(f"[MCP] Arguments: {json.dumps(arguments, indent=2)[:300]}", flush=True)
 
-            result = await call_tool(tool_name, arguments)
+            meta = {**(meta_defaults or {}), **(params.get("_meta") or {})}
+            try:
+                result = await admitted_call(tool_name, arguments, meta)
+            except admission.Overloaded as e:
+                print(f"[MCP] Shed {tool_name}: {e}", flush=True)
+                return jsonrpc.error_body(request_id, -32000, f"Server overloaded: {e}"), 503
+            except (admission.DeadlineExceeded, asyncio.TimeoutError) as e:
+                print(f"[MCP] {tool_name}: {e}", flush=True)
+                return jsonrpc.error_body(request_id, -32001, str(e) or "Deadline exceeded"), 504
+            except ValueError as e:
+                return jsonrpc_error(-32602, f"Invalid params: {e}")
 
             print(f"[MCP] Tool {tool_name} completed, returning result", flush=True)
             return jsonrpc_response({
@@ -306,14 +531,166 @@ async def handle_messages(request: Request):
         timestamp = datetime.now().isoformat()
         print(f"\n[MCP ERROR {timestamp}] Exception in handle_messages:", flush=True)
         traceback.print_exc()
-        print(f"[MCP ERROR] Request body: {json.dumps(body, indent=2)[:1000]}\n", flush=True)
+        print(f"[MCP ERROR] Request body: {str(body)[:1000]}\n", flush=True)
+        return jsonrpc.error_body(request_id, -32603, f"Internal error: {str(e)}"), 400
+
+
+async def _dispatch_batch_item(message, meta_defaults: dict) -> bytes | None:
+    async with _batch_limit:
+        response, _ = await dispatch_message(message, meta_defaults)
+    # Requests without an id are notifications and get no response
+    if isinstance(message, dict) and "id" not in message:
+        return None
+    return response
+
+
+async def handle_messages(request: Request):
+    """Handle POST /mcp endpoint - MCP protocol over HTTP (JSON-RPC 2.0, including batches)"""
+    try:
+        body = jsonrpc.loads(await request.body())
+    except jsonrpc.JSONDecodeError as e:
+        print(f"[MCP] Parse error: {e}", flush=True)
+        return JSONRPCResponse(jsonrpc.error_body(None, -32700, f"Parse error: {e}"), status_code=400)
+
+    meta_defaults = admission.request_meta(request.headers)
+
+    if isinstance(body, list):
+        if not body:
+            return JSONRPCResponse(jsonrpc.error_body(None, -32600, "Invalid Request: empty batch"), status_code=400)
+        print(f"[MCP] Received batch of {len(body)} messages", flush=True)
+        # Calls run concurrently (bounded by MCP_BATCH_CONCURRENCY); gather keeps request order
+        responses = await asyncio.gather(*(_dispatch_batch_item(m, meta_defaults) for m in body))
+        parts = [r for r in responses if r is not None]
+        if not parts:
+            return Response(status_code=202)
+        return JSONRPCResponse(b"[" + b",".join(parts) + b"]")
+
+    progress_token = _progress_token(body)
+    if progress_token is not None and "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_tool_call(body, progress_token, meta_defaults),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
+
+    response, status_code = await dispatch_message(body, meta_defaults)
+    if response is None:
+        return JSONRPCResponse(b"{}")
+    return JSONRPCResponse(response, status_code=status_code)
+
+
+def _progress_token(body):
+    """progressToken of a tools/call request that asked for progress, else None"""
+    if not isinstance(body, dict) or body.get("method") != "tools/call":
+        return None
+    meta = (body.get("params") or {}).get("_meta") or {}
+    return meta.get("progressToken")
+
+
+def _sse_event(payload: bytes) -> bytes:
+    return b"event: message\ndata: " + payload + b"\n\n"
+
+
+async def _stream_tool_call(body: dict, progress_token, meta_defaults: dict):
+    """
+    Streamable HTTP response for one tools/call: progress notifications (with
+    partial content where the tool has some) as they happen, then the result.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run():
+        with progress.reporting_to(progress.queue_reporter(queue, progress_token)):
+            return await dispatch_message(body, meta_defaults)
+
+    task = asyncio.create_task(run())
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield _sse_event(jsonrpc.dumps(getter.result()))
+            else:
+                getter.cancel()
+        while not queue.empty():
+            yield _sse_event(jsonrpc.dumps(queue.get_nowait()))
+        response, _ = task.result()
+        yield _sse_event(response)
+    finally:
+        # Client went away: stop the tool call
+        if not task.done():
+            task.cancel()
+
+
+async def handle_metrics(request: Request):
+    """Handle GET /metrics endpoint - outbound host health and cache statistics"""
+    return JSONResponse({
+        "outbound_hosts": host_guard.snapshot(),
+        "search_cache": dict(search_cache.stats, entries=len(search_cache)),
+        "document_store": {"documents": len(document_store)},
+        "extractors": extractors.stats_snapshot(),
+        "tool_calls": dict(profiling.call_stats, slow_threshold_ms=profiling.SLOW_CALL_MS),
+        "admission": admission.controller.snapshot(),
+    })
+
+
+def _debug_denied(request: Request) -> Response | None:
+    """Debug routes need PROFILE_TOKEN as a bearer token; without one configured they do not exist."""
+    if not profiling.PROFILE_TOKEN:
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    if not profiling.authorized(request.headers.get("authorization", "")):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401,
+                            headers={"WWW-Authenticate": "Bearer"})
+    return None
+
+
+async def handle_profile(request: Request):
+    """
+    Handle GET /debug/profile - profile the live process.
+
+    Query: seconds (default 10), format=collapsed|pstats, interval_ms (sampling
+    interval, default 5) and idle=true to keep threads that are waiting for work.
+    """
+    denied = _debug_denied(request)
+    if denied is not None:
+        return denied
+
+    query = request.query_params
+    try:
+        seconds = float(query.get("seconds", 10))
+        interval_ms = float(query.get("interval_ms", 5))
+    except ValueError:
+        return JSONResponse({"error": "seconds and interval_ms must be numbers"}, status_code=400)
+    if not 0 < seconds <= profiling.PROFILE_MAX_SECONDS or not 1 <= interval_ms <= 1000:
+        return JSONResponse({
+            "error": f"seconds must be in (0, {profiling.PROFILE_MAX_SECONDS}] and interval_ms in [1, 1000]"
+        }, status_code=400)
+    format = query.get("format", "collapsed")
+    if format not in ("collapsed", "pstats"):
+        return JSONResponse({"error": "format must be collapsed or pstats"}, status_code=400)
+
+    try:
+        data = await profiling.run_profile(
+            seconds, format, interval_ms / 1000, query.get("idle", "false").lower() == "true"
+        )
+    except profiling.ProfilerBusy as e:
+        return JSONResponse({"error": str(e)}, status_code=409)
+
+    if format == "pstats":
+        return Response(data, media_type="application/octet-stream",
+                        headers={"Content-Disposition": 'attachment; filename="mcp-web.pstats"'})
+    return Response(data, media_type="text/plain; charset=utf-8")
+
 
-        # Try to return error response if we have request_id
-        try:
-            return jsonrpc_error(-32603, f"Internal error: {str(e)}")
-        except:
-            # If jsonrpc_error fails, return basic error
-            return JSONResponse({"error": str(e)}, status_code=500)
+async def handle_slow_calls(request: Request):
+    """Handle GET /debug/slow-calls - recent tool calls over SLOW_CALL_MS with stage timings"""
+    denied = _debug_denied(request)
+    if denied is not None:
+        return denied
+    return JSONRPCResponse({
+        "threshold_ms": profiling.SLOW_CALL_MS,
+        "stats": profiling.call_stats,
+        "calls": list(profiling.slow_calls),
+    })
 
 
 # Create Starlette app
@@ -322,6 +699,10 @@ app = Starlette(
     routes=[
         Route("/mcp", handle_messages, methods=["POST"]),
         Route("/sse", handle_sse, methods=["GET"]),
+        Mount("/messages/", app=sse_transport.handle_post_message),
+        Route("/metrics", handle_metrics, methods=["GET"]),
+        Route("/debug/profile", handle_profile, methods=["GET"]),
+        Route("/debug/slow-calls", handle_slow_calls, methods=["GET"]),
     ]
 )
 
@@ -334,8 +715,14 @@ def main():
     print("Available tools:", flush=True)
     print("  - search: Web search using DDGS metasearch", flush=True)
     print("  - fetch: Extract clean content from web pages", flush=True)
+    print("  - fetch_many: Fetch several web pages concurrently", flush=True)
+    print("  - fetch_more: Continue reading a truncated page by cursor", flush=True)
+    print("  - research: Search, read top results and return ranked passages", flush=True)
     print("  - json_fetch: Fetch JSON from APIs", flush=True)
     print(f"\nHTTP endpoint: http://0.0.0.0:{port}/mcp", flush=True)
+    print(f"Metrics: http://0.0.0.0:{port}/metrics", flush=True)
+    if profiling.PROFILE_TOKEN:
+        print(f"Profiling: http://0.0.0.0:{port}/debug/profile (bearer token required)", flush=True)
 
     uvicorn.run(
         app,
@@ -0,0 +1,95 @@
+"""Async TTL cache with single-flight loading and stale fallback"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    In-memory TTL cache for async loaders.
+
+    - Fresh entries (younger than ttl) are served without calling the loader.
+    - Concurrent misses for the same key share one in-flight load (single-flight).
+    - When a load fails and serve_stale(exc) is true, an expired entry that is
+      still within stale_ttl is served instead of raising.
+    - At most max_entries are kept; the least recently used entry is evicted.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: int = 1000):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0, "errors": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable, max_age: float) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if time.monotonic() - stored_at > max_age:
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        serve_stale: Callable[[Exception], bool] = lambda exc: True,
+    ) -> tuple[Any, str]:
+        """Return (value, status) where status is hit, miss, coalesced or stale."""
+        if self.ttl > 0:
+            value = self._lookup(key, self.ttl)
+            if value is not None:
+                self.stats["hits"] += 1
+                return value, "hit"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                value = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The load we joined was cancelled; run our own below
+            else:
+                self.stats["coalesced"] += 1
+                return value, "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except Exception as exc:
+            self.stats["errors"] += 1
+            stale = self._lookup(key, self.ttl + self.stale_ttl) if serve_stale(exc) else None
+            if stale is not None:
+                self.stats["stale"] += 1
+                future.set_result(stale)
+                return stale, "stale"
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            self.stats["misses"] += 1
+            if self.ttl > 0:
+                self._store(key, value)
+            future.set_result(value)
+            return value, "miss"
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                # Loader was cancelled; waiters fall back to loading themselves
+                future.cancel()
@@ -0,0 +1,96 @@
+"""TTL-bounded store of extracted documents for cursor-based paging"""
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+
+FETCH_CURSOR_TTL = float(os.environ.get("FETCH_CURSOR_TTL", 900))
+FETCH_CURSOR_MAX_DOCS = int(os.environ.get("FETCH_CURSOR_MAX_DOCS", 200))
+FETCH_CURSOR_MAX_CHARS = int(os.environ.get("FETCH_CURSOR_MAX_CHARS", 20_000_000))
+
+
+@dataclass
+class StoredDocument:
+    url: str
+    title: str
+    content: str
+    format: str
+    last_access: float
+
+
+class DocumentStore:
+    """
+    Keeps full extracted documents so later slices need no network or
+    extraction work. Entries expire after ttl seconds without access; the
+    least recently used documents are evicted when either max_docs or
+    max_chars is exceeded.
+    """
+
+    def __init__(self, ttl: float, max_docs: int, max_chars: int):
+        self.ttl = ttl
+        self.max_docs = max_docs
+        self.max_chars = max_chars
+        self._docs: OrderedDict[str, StoredDocument] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _remove(self, doc_id: str) -> None:
+        doc = self._docs.pop(doc_id)
+        self._chars -= len(doc.content)
+
+    def _expire(self, now: float) -> None:
+        while self._docs:
+            doc_id, doc = next(iter(self._docs.items()))
+            if now - doc.last_access <= self.ttl:
+                break
+            self._remove(doc_id)
+
+    def put(self, url: str, title: str, content: str, format: str) -> Optional[str]:
+        """Store a document and return its id, or None if it can never fit."""
+        if len(content) > self.max_chars:
+            return None
+        doc_id = secrets.token_urlsafe(9)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._docs[doc_id] = StoredDocument(url, title, content, format, now)
+            self._chars += len(content)
+            while len(self._docs) > self.max_docs or self._chars > self.max_chars:
+                self._remove(next(iter(self._docs)))
+        return doc_id
+
+    def get(self, doc_id: str) -> Optional[StoredDocument]:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            doc = self._docs.get(doc_id)
+            if doc is not None:
+                # Keeps the dict ordered by last access, which _expire relies on
+                doc.last_access = now
+                self._docs.move_to_end(doc_id)
+            return doc
+
+
+document_store = DocumentStore(
+    ttl=FETCH_CURSOR_TTL,
+    max_docs=FETCH_CURSOR_MAX_DOCS,
+    max_chars=FETCH_CURSOR_MAX_CHARS
+)
+
+
+def make_cursor(doc_id: str, offset: int) -> str:
+    return f"{doc_id}:{offset}"
+
+
+def parse_cursor(cursor: str) -> tuple[str, int]:
+    doc_id, sep, offset = cursor.strip().rpartition(":")
+    if not sep or not doc_id or not offset.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return doc_id, int(offset)
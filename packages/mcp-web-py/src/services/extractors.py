@@ -0,0 +1,433 @@
+"""Content extractors for fetched responses, chosen by content type"""
+import html as html_lib
+import json
+import os
+import re
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import unquote, urlsplit
+import html2text
+import requests
+import trafilatura
+from readability import Document
+
+
+# Body cap for the non-HTML extractors (text, JSON, feeds, PDF)
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", 10_000_000))
+FETCH_FEED_MAX_ITEMS = int(os.environ.get("FETCH_FEED_MAX_ITEMS", 50))
+FETCH_PDF_MAX_PAGES = int(os.environ.get("FETCH_PDF_MAX_PAGES", 30))
+FETCH_PDF_MAX_BYTES = int(os.environ.get("FETCH_PDF_MAX_BYTES", 20_000_000))
+
+# PDFs bigger than this are spooled to a temporary file instead of memory
+_PDF_SPOOL_BYTES = 5_000_000
+_CHUNK_BYTES = 65536
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+
+
+@dataclass
+class Extraction:
+    title: str
+    content: str
+    author: Optional[str] = None
+
+
+Extractor = Callable[[requests.Response, str, str], Extraction]
+
+_registry: dict[str, tuple[str, Extractor]] = {}
+extractor_stats: dict[str, dict] = {}
+
+
+def register(name: str, *content_types: str):
+    """Register an extractor(response, url, format) for the given MIME types."""
+    def decorator(fn: Extractor) -> Extractor:
+        for content_type in content_types:
+            _registry[content_type] = (name, fn)
+        extractor_stats[name] = {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+        return fn
+    return decorator
+
+
+def _mime(response: requests.Response) -> str:
+    return (response.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+
+def extractor_for(mime: str, url: str) -> tuple[str, Extractor]:
+    """
+    Pick the extractor for a MIME type: an exact match, then the structured
+    syntax suffix (+json, +xml), then text/* as plain text. Untyped and
+    octet-stream responses are treated as PDF when the URL says so and as
+    HTML otherwise, as is everything unknown.
+    """
+    if mime in _registry:
+        return _registry[mime]
+    if mime.endswith("+json"):
+        return _registry["application/json"]
+    if mime.endswith("+xml"):
+        return _registry["application/xml"]
+    if mime.startswith("text/"):
+        return _registry["text/plain"]
+    if mime in ("", "application/octet-stream") and urlsplit(url).path.lower().endswith(".pdf"):
+        return _registry["application/pdf"]
+    return _registry["text/html"]
+
+
+def extract(response: requests.Response, url: str, format: str) -> tuple[str, Extraction]:
+    """Run the extractor for the response's content type; returns its name and the result."""
+    name, fn = extractor_for(_mime(response), url)
+    start = time.perf_counter()
+    try:
+        try:
+            result = fn(response, url, format)
+        except ExtractAsHtml as fallback:
+            # The body was HTML after all: the whole call counts as an HTML extraction
+            name = "html"
+            result = _extract_html_text(fallback.html, format)
+    except Exception:
+        extractor_stats[name]["errors"] += 1
+        raise
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        stats = extractor_stats[name]
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed
+        stats["max_ms"] = max(stats["max_ms"], elapsed)
+    print(f"[Fetch] Extracted {len(result.content)} chars with {name} in {elapsed:.2f}ms")
+    return name, result
+
+
+def stats_snapshot() -> dict:
+    return {
+        name: dict(s, total_ms=round(s["total_ms"], 2), max_ms=round(s["max_ms"], 2),
+                   mean_ms=round(s["total_ms"] / s["calls"], 2) if s["calls"] else 0)
+        for name, s in extractor_stats.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class ExtractAsHtml(Exception):
+    """Raised by an extractor whose response turned out to be HTML; extract() hands *html* to the HTML extractor."""
+
+    def __init__(self, html: str):
+        super().__init__("Response is HTML")
+        self.html = html
+
+
+def _read_capped(response: requests.Response, max_bytes: int) -> bytes:
+    body = bytearray()
+    for chunk in response.iter_content(_CHUNK_BYTES):
+        body += chunk
+        if len(body) > max_bytes:
+            raise BodyTooLarge(f"Response body exceeds {max_bytes} bytes")
+    return bytes(body)
+
+
+def _decode(response: requests.Response, body: bytes) -> str:
+    # requests assumes ISO-8859-1 for text/* without a charset; UTF-8 is the better guess today
+    declared = "charset=" in (response.headers.get("Content-Type") or "").lower()
+    return body.decode(response.encoding if declared and response.encoding else "utf-8", errors="replace")
+
+
+def _url_title(url: str) -> str:
+    name = unquote(urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1])
+    return name or urlsplit(url).hostname or url
+
+
+def _as_code(text: str, format: str, language: str = "") -> str:
+    if format == "markdown":
+        return f"```{language}\n{text}\n```"
+    if format == "html":
+        return f"<pre>{html_lib.escape(text)}</pre>"
+    return text
+
+
+def _strip_html(text: str) -> str:
+    return _SPACE_RE.sub(" ", html_lib.unescape(_TAG_RE.sub(" ", text))).strip()
+
+
+# ---------------------------------------------------------------------------
+# HTML
+# ---------------------------------------------------------------------------
+
+@register("html", "text/html", "application/xhtml+xml")
+def extract_html(response: requests.Response, url: str, format: str) -> Extraction:
+    """
+    trafilatura (F1: 0.958) as the primary extraction method, with
+    readability-lxml as fallback.
+    """
+    return _extract_html_text(response.text, format)
+
+
+def _extract_html_text(html: str, format: str) -> Extraction:
+    # Try trafilatura first (best quality)
+    content = trafilatura.extract(
+        html,
+        include_comments=False,
+        include_tables=True,
+        no_fallback=False
+    )
+
+    if content:
+        # Extract metadata
+        metadata = trafilatura.extract_metadata(html)
+        title = metadata.title if metadata and metadata.title else "Untitled"
+        author = metadata.author if metadata and metadata.author else None
+
+        # Convert to requested format
+        if format == "markdown":
+            # trafilatura can output markdown directly, but html2text gives better formatting
+            h = html2text.HTML2Text()
+            h.ignore_links = False
+            h.body_width = 0  # Don't wrap lines
+            # First get HTML from trafilatura with better structure
+            html_content = trafilatura.extract(html, include_comments=False, include_tables=True, output_format="xml")
+            if html_content:
+                content = h.handle(html_content)
+            else:
+                content = h.handle(content)
+        elif format == "text":
+            content = trafilatura.extract(html, no_fallback=False, output_format="txt")
+
+        return Extraction(title, content, author)
+
+    # Fallback to readability
+    print("[Fetch] Trafilatura failed, falling back to readability")
+    doc = Document(html)
+    title = doc.title()
+    content_html = doc.summary()
+
+    if format == "markdown":
+        h = html2text.HTML2Text()
+        h.ignore_links = False
+        h.body_width = 0
+        content = h.handle(content_html)
+    elif format == "text":
+        # Strip HTML tags for text
+        h = html2text.HTML2Text()
+        h.ignore_links = True
+        h.ignore_images = True
+        content = h.handle(content_html)
+    else:  # html
+        content = content_html
+
+    return Extraction(title, content)
+
+
+# ---------------------------------------------------------------------------
+# Plain text and markdown: passed through
+# ---------------------------------------------------------------------------
+
+@register("text", "text/plain", "text/markdown", "text/x-markdown")
+def extract_text(response: requests.Response, url: str, format: str) -> Extraction:
+    text = _decode(response, _read_capped(response, FETCH_MAX_BYTES))
+    title = _url_title(url)
+    if _mime(response) in ("text/markdown", "text/x-markdown") or url.lower().endswith(".md"):
+        heading = next((line[2:].strip() for line in text.splitlines() if line.startswith("# ")), None)
+        title = heading or title
+        content = text if format != "html" else _as_code(text, format)
+    else:
+        content = _as_code(text, format) if format == "html" else text
+    return Extraction(title, content)
+
+
+# ---------------------------------------------------------------------------
+# JSON: pretty-printed
+# ---------------------------------------------------------------------------
+
+@register("json", "application/json", "text/json")
+def extract_json(response: requests.Response, url: str, format: str) -> Extraction:
+    text = _decode(response, _read_capped(response, FETCH_MAX_BYTES))
+    try:
+        text = json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+    except ValueError:
+        # Mislabelled or truncated: show it as it came
+        return Extraction(_url_title(url), _as_code(text, format) if format == "html" else text)
+    return Extraction(_url_title(url), _as_code(text, format, "json"))
+
+
+# ---------------------------------------------------------------------------
+# Feeds: parsed while streaming, stopping after FETCH_FEED_MAX_ITEMS
+# ---------------------------------------------------------------------------
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _child_text(elem: ET.Element, *names: str) -> str:
+    for child in elem:
+        if _local(child.tag) in names and (child.text or "").strip():
+            return child.text.strip()
+    return ""
+
+
+def _entry_link(elem: ET.Element) -> str:
+    for child in elem:
+        if _local(child.tag) == "link":
+            # Atom: <link rel="alternate" href="..."/>; RSS: <link>...</link>
+            href = child.get("href")
+            if href and child.get("rel", "alternate") == "alternate":
+                return href
+            if (child.text or "").strip():
+                return child.text.strip()
+    return ""
+
+
+def _render_feed(title: str, items: list[dict], format: str, more: bool) -> str:
+    parts = []
+    if format == "markdown":
+        parts.append(f"# {title}\n")
+        for item in items:
+            heading = f"[{item['title']}]({item['link']})" if item["link"] else item["title"]
+            parts.append(f"## {heading}\n" + (f"*{item['date']}*\n" if item["date"] else "") + f"\n{item['summary']}\n")
+    elif format == "html":
+        parts.append(f"<h1>{html_lib.escape(title)}</h1>")
+        for item in items:
+            heading = html_lib.escape(item["title"])
+            if item["link"]:
+                heading = f'<a href="{html_lib.escape(item["link"])}">{heading}</a>'
+            date = f"<p><em>{html_lib.escape(item['date'])}</em></p>" if item["date"] else ""
+            parts.append(f"<article><h2>{heading}</h2>{date}<p>{html_lib.escape(item['summary'])}</p></article>")
+    else:
+        parts.append(f"{title}\n")
+        for item in items:
+            parts.append("\n".join(x for x in (item["title"], item["link"], item["date"], item["summary"]) if x) + "\n")
+    if more:
+        parts.append(f"[Showing the first {len(items)} items]")
+    return "\n".join(parts)
+
+
+def _raw_xml(text: str, url: str, format: str) -> Extraction:
+    return Extraction(_url_title(url), _as_code(text, format, "xml"))
+
+
+@register("feed", "application/rss+xml", "application/atom+xml", "application/rdf+xml",
+          "application/xml", "text/xml")
+def extract_feed(response: requests.Response, url: str, format: str) -> Extraction:
+    """
+    RSS, Atom and RDF feeds, parsed incrementally so reading stops after
+    FETCH_FEED_MAX_ITEMS entries. Other XML is returned as it came, and a
+    body that is not well-formed before its first entry (often HTML served
+    as text/xml) goes to the HTML extractor.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    head = bytearray()
+    size = 0
+    is_feed = None
+    depth = 0
+    in_entry = False
+    feed_title = ""
+    author = None
+    items: list[dict] = []
+    more = False
+
+    for chunk in response.iter_content(_CHUNK_BYTES):
+        size += len(chunk)
+        if size > FETCH_MAX_BYTES:
+            raise BodyTooLarge(f"Response body exceeds {FETCH_MAX_BYTES} bytes")
+        if not items:
+            # Kept until the first entry, for plain XML and the HTML fallback
+            head += chunk
+        try:
+            parser.feed(chunk)
+            events = list(parser.read_events())
+        except ET.ParseError:
+            if items:
+                break
+            print("[Fetch] Not well-formed XML, extracting as HTML")
+            rest = _read_capped(response, FETCH_MAX_BYTES - size)
+            raise ExtractAsHtml(_decode(response, bytes(head) + rest))
+
+        for event, elem in events:
+            name = _local(elem.tag)
+            if event == "start":
+                depth += 1
+                if is_feed is None:
+                    is_feed = name in ("rss", "feed", "rdf")
+                    if not is_feed:
+                        # Plain XML document: return the body as it came
+                        rest = _read_capped(response, FETCH_MAX_BYTES - size)
+                        return _raw_xml(_decode(response, bytes(head) + rest), url, format)
+                if name in ("item", "entry"):
+                    in_entry = True
+                continue
+            depth -= 1
+            if name in ("item", "entry"):
+                in_entry = False
+                if len(items) == FETCH_FEED_MAX_ITEMS:
+                    more = True
+                    break
+                items.append({
+                    "title": _strip_html(_child_text(elem, "title")) or "Untitled",
+                    "link": _entry_link(elem),
+                    "date": _child_text(elem, "pubdate", "published", "updated", "date"),
+                    "summary": _strip_html(_child_text(elem, "description", "summary", "content", "encoded")),
+                })
+                head.clear()
+                elem.clear()
+            elif in_entry or depth > 2:
+                continue
+            elif name == "title" and not feed_title:
+                # <rss><channel><title>, <feed><title>, <rdf:RDF><channel><title>
+                feed_title = _strip_html(elem.text or "")
+            elif name in ("managingeditor", "author") and author is None:
+                author = _child_text(elem, "name") or (elem.text or "").strip() or None
+        if more:
+            # Enough entries: stop downloading the rest of the feed
+            response.close()
+            break
+
+    return Extraction(feed_title or _url_title(url), _render_feed(feed_title or _url_title(url), items, format, more),
+                      author)
+
+
+# ---------------------------------------------------------------------------
+# PDF: text of the first FETCH_PDF_MAX_PAGES pages
+# ---------------------------------------------------------------------------
+
+@register("pdf", "application/pdf", "application/x-pdf")
+def extract_pdf(response: requests.Response, url: str, format: str) -> Extraction:
+    """
+    Text of the first FETCH_PDF_MAX_PAGES pages. A PDF's index is at its end,
+    so the body is streamed (capped at FETCH_PDF_MAX_BYTES) into a spooled
+    temporary file, then only the pages needed are parsed.
+    """
+    from pypdf import PdfReader
+
+    with tempfile.SpooledTemporaryFile(max_size=_PDF_SPOOL_BYTES) as spool:
+        size = 0
+        for chunk in response.iter_content(_CHUNK_BYTES):
+            size += len(chunk)
+            if size > FETCH_PDF_MAX_BYTES:
+                raise BodyTooLarge(f"PDF exceeds {FETCH_PDF_MAX_BYTES} bytes")
+            spool.write(chunk)
+        spool.seek(0)
+
+        reader = PdfReader(spool)
+        metadata = reader.metadata
+        title = (metadata.title if metadata and metadata.title else "") or _url_title(url)
+        author = metadata.author if metadata and metadata.author else None
+        total = len(reader.pages)
+        pages = []
+        for number in range(min(total, FETCH_PDF_MAX_PAGES)):
+            text = (reader.pages[number].extract_text() or "").strip()
+            if format == "markdown":
+                pages.append(f"## Page {number + 1}\n\n{text}")
+            elif format == "html":
+                pages.append(f'<section data-page="{number + 1}"><pre>{html_lib.escape(text)}</pre></section>')
+            else:
+                pages.append(text)
+
+    content = "\n\n".join(pages)
+    if total > FETCH_PDF_MAX_PAGES:
+        content += f"\n\n[Showing pages 1-{FETCH_PDF_MAX_PAGES} of {total}]"
+    return Extraction(title, content, author)
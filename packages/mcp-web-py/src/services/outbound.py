@@ -0,0 +1,215 @@
+"""Shared outbound HTTP state: session, per-host circuit breaker and rate limiter"""
+import http.cookiejar
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+import requests
+
+from src.services import replay
+
+
+# Circuit breaker: after OUTBOUND_FAILURE_THRESHOLD consecutive failures (connect
+# errors, timeouts, 5xx) a host is failed fast for OUTBOUND_OPEN_SECONDS, then a
+# single probe request decides whether it closes again.
+OUTBOUND_FAILURE_THRESHOLD = int(os.environ.get("OUTBOUND_FAILURE_THRESHOLD", 5))
+OUTBOUND_OPEN_SECONDS = float(os.environ.get("OUTBOUND_OPEN_SECONDS", 30))
+
+# Token bucket per host. The rate is halved on 429/503 and recovers additively
+# on success, never exceeding OUTBOUND_RATE.
+OUTBOUND_RATE = float(os.environ.get("OUTBOUND_RATE", 5))
+OUTBOUND_BURST = float(os.environ.get("OUTBOUND_BURST", 10))
+OUTBOUND_MIN_RATE = float(os.environ.get("OUTBOUND_MIN_RATE", 0.2))
+
+# Longest a request may wait for a token or a Retry-After window before it is
+# rejected instead.
+OUTBOUND_MAX_WAIT = float(os.environ.get("OUTBOUND_MAX_WAIT", 2))
+
+_MAX_TRACKED_HOSTS = 1000
+_IDLE_HOST_SECONDS = 600
+
+session = requests.Session()
+# The session is shared by every caller, so it must not carry one user's cookies
+# into another user's request. Its jar accepts none; cookies set during a
+# redirect chain still apply within that one request.
+session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+_adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
+
+
+class HostUnavailable(Exception):
+    """Raised without touching the network when a host is known to be failing or throttled."""
+
+    def __init__(self, host: str, reason: str, retry_in: float):
+        super().__init__(f"{host} unavailable: {reason} (retry in {retry_in:.1f}s)")
+        self.host = host
+        self.reason = reason
+        self.retry_in = retry_in
+
+
+class _HostState:
+    def __init__(self, now: float):
+        self.state = "closed"  # closed | open | half_open
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.rate = OUTBOUND_RATE
+        self.tokens = OUTBOUND_BURST
+        self.refilled_at = now
+        self.blocked_until = 0.0  # from Retry-After
+        self.last_used = now
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_for": round(max(0.0, self.open_until - now), 1),
+            "retry_after": round(max(0.0, self.blocked_until - now), 1),
+            "rate": round(self.rate, 3),
+            "tokens": round(self.tokens, 2),
+            "requests": self.requests,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+        }
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostGuard:
+    """Thread-safe per-host health and rate state shared by all outbound tools."""
+
+    def __init__(self):
+        self._hosts: dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str, now: float) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= _MAX_TRACKED_HOSTS:
+                self._prune(now)
+            state = self._hosts[host] = _HostState(now)
+        return state
+
+    def _prune(self, now: float) -> None:
+        for host, state in list(self._hosts.items()):
+            if state.state == "closed" and now - state.last_used > _IDLE_HOST_SECONDS:
+                del self._hosts[host]
+
+    def acquire(self, host: str) -> None:
+        """Wait for permission to contact *host* or raise HostUnavailable."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                state = self._state(host, now)
+                state.last_used = now
+
+                if state.state == "open":
+                    if now < state.open_until:
+                        state.rejected += 1
+                        raise HostUnavailable(host, "circuit open after repeated failures", state.open_until - now)
+                    state.state = "half_open"
+                if state.state == "half_open":
+                    if state.probe_in_flight:
+                        state.rejected += 1
+                        raise HostUnavailable(host, "circuit half-open, probe in progress", OUTBOUND_OPEN_SECONDS)
+                    # this request becomes the probe below
+
+                wait = state.blocked_until - now
+                if wait <= 0:
+                    state.tokens = min(OUTBOUND_BURST, state.tokens + (now - state.refilled_at) * state.rate)
+                    state.refilled_at = now
+                    if state.tokens >= 1:
+                        state.tokens -= 1
+                        state.requests += 1
+                        if state.state == "half_open":
+                            state.probe_in_flight = True
+                        return
+                    wait = (1 - state.tokens) / state.rate
+
+                if wait > OUTBOUND_MAX_WAIT:
+                    state.rejected += 1
+                    reason = "rate limited (Retry-After)" if state.blocked_until > now else "rate limited"
+                    raise HostUnavailable(host, reason, wait)
+            time.sleep(wait)
+
+    def record(self, host: str, response: Optional[requests.Response] = None, failed: bool = False) -> None:
+        """Record the outcome of a request admitted by acquire()."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            state.probe_in_flight = False
+            status = response.status_code if response is not None else None
+
+            if status in (429, 503):
+                state.throttled += 1
+                state.rate = max(OUTBOUND_MIN_RATE, state.rate / 2)
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after:
+                    state.blocked_until = max(state.blocked_until, now + retry_after)
+            elif not failed and (status is None or status < 500):
+                state.rate = min(OUTBOUND_RATE, state.rate + OUTBOUND_RATE / 10)
+
+            if failed or (status is not None and status >= 500):
+                state.failures += 1
+                state.consecutive_failures += 1
+                if state.state == "half_open" or state.consecutive_failures >= OUTBOUND_FAILURE_THRESHOLD:
+                    if state.state != "open":
+                        print(f"[Outbound] Circuit open for {host} after {state.consecutive_failures} failures")
+                    state.state = "open"
+                    state.open_until = now + OUTBOUND_OPEN_SECONDS
+            else:
+                if state.state != "closed":
+                    print(f"[Outbound] Circuit closed for {host}")
+                state.state = "closed"
+                state.consecutive_failures = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {host: state.snapshot(now) for host, state in sorted(self._hosts.items())}
+
+
+host_guard = HostGuard()
+
+
+def guarded_request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session, subject to the host's circuit
+    breaker and rate limit. Raises HostUnavailable without network I/O when the
+    host is known to be down or throttled.
+    """
+    host = urlsplit(url).hostname or ""
+    host_guard.acquire(host)
+    try:
+        response = replay.send(session, method, url, **kwargs)
+    except requests.exceptions.SSLError:
+        # Certificate problems say nothing about host health; callers may retry unverified
+        host_guard.record(host)
+        raise
+    except requests.exceptions.RequestException:
+        host_guard.record(host, failed=True)
+        raise
+    except BaseException:
+        host_guard.record(host)
+        raise
+    host_guard.record(host, response)
+    return response
@@ -0,0 +1,216 @@
+"""Record/replay of outbound HTTP exchanges and DDGS results for offline runs"""
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import requests
+
+
+# off: normal operation. record: go live and save every exchange. replay:
+# answer only from the fixture store, never touching the network.
+WEB_REPLAY_MODE = os.environ.get("WEB_REPLAY_MODE", "off").lower()
+WEB_REPLAY_DIR = os.environ.get("WEB_REPLAY_DIR", "fixtures/web")
+
+# Transfer-level headers do not apply to the stored (decoded) body
+_DROP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"})
+
+
+class ReplayMiss(requests.exceptions.ConnectionError):
+    """Replay mode has no recording for this request."""
+
+
+def _body_bytes(data) -> bytes:
+    if data is None:
+        return b""
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if isinstance(data, bytes):
+        return data
+    return json.dumps(data, sort_keys=True).encode("utf-8")
+
+
+class FixtureStore:
+    """
+    Recorded exchanges on disk.
+
+    http/<key>.json holds method, URL, status and headers and http/<key>.body
+    the decoded response body; search/<key>.json holds DDGS results. Keys are
+    hashes of the request, so recordings from several runs can be merged by
+    copying files.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def http_key(method: str, url: str, body: bytes = b"") -> str:
+        digest = hashlib.sha1(f"{method.upper()} {url}\n".encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    def search_key(query: str, region: str, backend: str) -> str:
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha1(f"{normalized}\n{region}\n{backend}".encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, name: str) -> str:
+        return os.path.join(self.root, kind, name)
+
+    def _write(self, kind: str, name: str, data: bytes) -> None:
+        path = self._path(kind, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.{threading.get_ident()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def save_http(self, method: str, url: str, request_body: bytes, status: int, reason: str,
+                  headers: dict, body: bytes) -> str:
+        key = self.http_key(method, url, request_body)
+        meta = {
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "reason": reason,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._write("http", f"{key}.body", body)
+            self._write("http", f"{key}.json", json.dumps(meta, indent=2).encode("utf-8"))
+        return key
+
+    def load_http(self, key: str) -> Optional[tuple[dict, bytes]]:
+        try:
+            with open(self._path("http", f"{key}.json"), "rb") as f:
+                meta = json.loads(f.read())
+            with open(self._path("http", f"{key}.body"), "rb") as f:
+                return meta, f.read()
+        except FileNotFoundError:
+            return None
+
+    def has_http(self, key: str) -> bool:
+        return os.path.exists(self._path("http", f"{key}.json"))
+
+    def http_entries(self) -> list[dict]:
+        """Metadata of all recorded exchanges, with their key."""
+        directory = os.path.join(self.root, "http")
+        if not os.path.isdir(directory):
+            return []
+        entries = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    entries.append(dict(json.loads(f.read()), key=name[:-5]))
+        return entries
+
+    def save_search(self, query: str, region: str, backend: str, results: list[dict]) -> None:
+        record = {"query": query, "region": region, "backend": backend, "results": results}
+        with self._lock:
+            self._write("search", f"{self.search_key(query, region, backend)}.json",
+                        json.dumps(record, indent=2).encode("utf-8"))
+
+    def load_search(self, query: str, region: str, backend: str) -> Optional[list[dict]]:
+        try:
+            with open(self._path("search", f"{self.search_key(query, region, backend)}.json"), "rb") as f:
+                return json.loads(f.read())["results"]
+        except FileNotFoundError:
+            return None
+
+
+class StandInServer:
+    """Local HTTP server answering GET/POST /<key> with the recorded response."""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+        store_ref = store
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                recorded = store_ref.load_http(self.path.lstrip("/"))
+                if recorded is None:
+                    self.send_error(404, "No recording")
+                    return
+                meta, body = recorded
+                self.send_response(meta["status"], meta.get("reason") or None)
+                for name, value in meta["headers"].items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, name="replay-standin", daemon=True).start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+store = FixtureStore(WEB_REPLAY_DIR)
+_standin: Optional[StandInServer] = None
+_standin_lock = threading.Lock()
+
+
+def _get_standin() -> StandInServer:
+    global _standin
+    with _standin_lock:
+        if _standin is None:
+            _standin = StandInServer(store)
+            print(f"[Replay] Stand-in server on {_standin.base_url} ({WEB_REPLAY_MODE}, {store.root})")
+        return _standin
+
+
+def send(session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request according to WEB_REPLAY_MODE.
+
+    In record mode the live response is saved first; in both record and replay
+    mode the response the caller sees is then served by the stand-in server,
+    so streaming, decoding and timeouts behave as they would on the network.
+    """
+    if WEB_REPLAY_MODE == "off":
+        return session.request(method, url, **kwargs)
+
+    request_body = _body_bytes(kwargs.get("data") if kwargs.get("data") is not None else kwargs.get("json"))
+    key = store.http_key(method, url, request_body)
+
+    if WEB_REPLAY_MODE == "record":
+        live = session.request(method, url, **dict(kwargs, stream=False))
+        store.save_http(method, url, request_body, live.status_code, live.reason, dict(live.headers), live.content)
+    elif not store.has_http(key):
+        raise ReplayMiss(f"No recording for {method.upper()} {url}")
+
+    replay_kwargs = {k: v for k, v in kwargs.items() if k not in ("data", "json", "verify")}
+    return session.request(method, f"{_get_standin().base_url}/{key}", **replay_kwargs)
+
+
+def search(run, query: str, region: str, backend: str, max_results: int) -> list[dict]:
+    """Run a DDGS search through run(...) according to WEB_REPLAY_MODE."""
+    if WEB_REPLAY_MODE == "replay":
+        results = store.load_search(query, region, backend)
+        if results is None:
+            raise ReplayMiss(f"No recorded search for '{query}' ({region}, {backend})")
+        return results[:max_results]
+
+    results = run(query, region, backend, max_results)
+    if WEB_REPLAY_MODE == "record":
+        store.save_search(query, region, backend, results)
+    return results
@@ -0,0 +1,123 @@
+"""Non-blocking, hedged DDGS search execution"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ddgs import DDGS
+
+from src.services import replay
+from agentic_shared.admission import check_deadline
+
+
+# DDGS is synchronous, so searches run on a bounded pool of worker threads.
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", 4))
+SEARCH_TIMEOUT = int(os.environ.get("SEARCH_TIMEOUT", 5))
+
+# Hedged requests: if the chosen backend has not produced results within
+# SEARCH_HEDGE_DELAY_MS, the first backend in SEARCH_HEDGE_BACKENDS that differs
+# from it is queried as well and the first non-empty answer wins.
+# SEARCH_HEDGE_DELAY_MS=0 disables hedging. Hedges run on their own
+# SEARCH_HEDGE_WORKERS threads so they never queue behind the searches they
+# are meant to overtake; when all of those are busy, the search is not hedged.
+SEARCH_HEDGE_DELAY_MS = float(os.environ.get("SEARCH_HEDGE_DELAY_MS", 2500))
+SEARCH_HEDGE_BACKENDS = [
+    b.strip() for b in os.environ.get("SEARCH_HEDGE_BACKENDS", "duckduckgo,brave").split(",") if b.strip()
+]
+SEARCH_HEDGE_WORKERS = int(os.environ.get("SEARCH_HEDGE_WORKERS", 2))
+
+_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+_hedge_executor = ThreadPoolExecutor(max_workers=SEARCH_HEDGE_WORKERS, thread_name_prefix="search-hedge")
+_local = threading.local()
+_hedges_running = 0
+
+
+def _get_ddgs() -> DDGS:
+    """Per-thread DDGS instance; it caches its engines and their HTTP sessions."""
+    ddgs = getattr(_local, "ddgs", None)
+    if ddgs is None:
+        ddgs = _local.ddgs = DDGS(timeout=SEARCH_TIMEOUT)
+    return ddgs
+
+
+def _search_sync(query: str, region: str, backend: str, max_results: int) -> list[dict]:
+    # A search that waited in the queue past the caller's deadline is not sent
+    check_deadline()
+    return replay.search(_ddgs_text, query, region, backend, max_results)
+
+
+def _ddgs_text(query: str, region: str, backend: str, max_results: int) -> list[dict]:
+    # Note: DDGS handles user-agent internally with realistic browser headers
+    results = _get_ddgs().text(
+        query=query,
+        region=region,
+        safesearch="off",
+        max_results=max_results,
+        backend=backend
+    )
+    return list(results)
+
+
+def _hedge_backend(backend: str):
+    for candidate in SEARCH_HEDGE_BACKENDS:
+        if candidate != backend:
+            return candidate
+    return None
+
+
+def _consume_result(future: asyncio.Future) -> None:
+    # Losing attempts still finish in their thread; retrieve their outcome so
+    # asyncio does not warn about unretrieved exceptions.
+    if not future.cancelled():
+        future.exception()
+
+
+def _hedge_finished(future: asyncio.Future) -> None:
+    global _hedges_running
+    _hedges_running -= 1
+
+
+async def run_search(query: str, region: str, backend: str, max_results: int) -> list[dict]:
+    """Run a DDGS text search off the event loop, hedging slow backends."""
+    global _hedges_running
+    loop = asyncio.get_running_loop()
+
+    def submit(executor: ThreadPoolExecutor, b: str) -> asyncio.Future:
+        # Run in a copy of this context so the worker sees the call's deadline
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(executor, context.run, _search_sync, query, region, b, max_results)
+        future.add_done_callback(_consume_result)
+        return future
+
+    primary = submit(_executor, backend)
+    hedge_backend = _hedge_backend(backend)
+    if SEARCH_HEDGE_DELAY_MS <= 0 or hedge_backend is None:
+        return await primary
+
+    done, _ = await asyncio.wait({primary}, timeout=SEARCH_HEDGE_DELAY_MS / 1000)
+    if done and primary.exception() is None and primary.result():
+        return primary.result()
+    if _hedges_running >= SEARCH_HEDGE_WORKERS:
+        print(f"[Search] Hedge workers busy, not hedging '{backend}'")
+        return await primary
+
+    # Primary is slow, failed or came back empty: ask a second backend
+    print(f"[Search] Hedging '{backend}' with '{hedge_backend}'")
+    _hedges_running += 1
+    hedge = submit(_hedge_executor, hedge_backend)
+    hedge.add_done_callback(_hedge_finished)
+    pending = {hedge} if done else {primary, hedge}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None and future.result():
+                if future is hedge:
+                    print(f"[Search] Hedge backend '{hedge_backend}' answered first")
+                return future.result()
+
+    # Neither attempt produced results: report the primary outcome
+    if primary.exception() is not None:
+        if hedge.exception() is None:
+            return hedge.result()
+        raise primary.exception()
+    return primary.result()
@@ -1,11 +1,15 @@
 """Web Fetch Tool using trafilatura and readability"""
+import asyncio
 from typing import Literal
 from pydantic import BaseModel, Field, HttpUrl
-import trafilatura
-from readability import Document
-import html2text
 import requests
 
+from src.services.outbound import guarded_request, HostUnavailable
+from src.services.extractors import BodyTooLarge, extract
+from src.services.document_store import document_store, make_cursor
+from agentic_shared.progress import report_progress
+from agentic_shared.admission import DeadlineExceeded, check_deadline, clamp_timeout
+
 
 class FetchInput(BaseModel):
     """Input schema for web fetch"""
@@ -18,11 +22,26 @@ async def fetch_tool(input: FetchInput) -> dict:
     """
     Fetch and extract clean content from web pages.
 
-    Uses trafilatura (F1: 0.958) as primary extraction method, with
-    readability-lxml as fallback. Supports markdown, HTML, and plain text output.
+    HTML goes through trafilatura (F1: 0.958) with readability-lxml as
+    fallback; plain text and markdown pass through, JSON is pretty-printed,
+    RSS/Atom feeds are parsed while streaming and PDFs are extracted page by
+    page. Supports markdown, HTML, and plain text output.
+    The blocking download and extraction run in a worker thread so the event
+    loop keeps serving other requests.
+    """
+    return await asyncio.to_thread(fetch_page, input)
+
+
+def fetch_page(input: FetchInput, store: bool = True) -> dict:
+    """
+    Synchronous fetch + extraction, shared by fetch_tool and fetch_many_tool.
+
+    With *store*, content over max_length is kept in the document store and
+    the result carries a fetch_more cursor; otherwise it is just truncated.
     """
     try:
         print(f"[Fetch] URL: {input.url}, Format: {input.format}")
+        report_progress(0, 3, f"Downloading {input.url}")
 
         # Fetch HTML - try with SSL verification first, then without if it fails
         # Use realistic browser headers to avoid bot detection
@@ -40,113 +59,102 @@ async def fetch_tool(input: FetchInput) -> dict:
             "Sec-Fetch-User": "?1",
         }
 
+        # Streamed, so non-HTML extractors can stop reading early and cap the body
         try:
-            response = requests.get(
+            response = guarded_request(
+                "GET",
                 str(input.url),
                 headers=headers,
-                timeout=10,
-                verify=True
+                timeout=clamp_timeout(10),
+                verify=True,
+                stream=True
             )
         except requests.exceptions.SSLError as ssl_error:
             print(f"[Fetch] SSL verification failed, retrying without verification: {ssl_error}")
             import warnings
             warnings.filterwarnings('ignore', message='Unverified HTTPS request')
-            response = requests.get(
+            response = guarded_request(
+                "GET",
                 str(input.url),
                 headers=headers,
-                timeout=10,
-                verify=False  # Disable SSL verification for problematic sites
+                timeout=clamp_timeout(10),
+                verify=False,  # Disable SSL verification for problematic sites
+                stream=True
             )
 
-        # Check for HTTP errors - return immediately without processing body
-        if response.status_code >= 400:
-            error_message = response.reason
-            # Check for error message in common headers
-            if 'X-Error-Message' in response.headers:
-                error_message = response.headers['X-Error-Message']
-            elif 'X-Error' in response.headers:
-                error_message = response.headers['X-Error']
-
-            print(f"[Fetch] HTTP Error {response.status_code}: {error_message}")
-            return {
-                "error": f"HTTP {response.status_code}: {error_message}",
-                "status_code": response.status_code,
-                "url": str(input.url),
-                "message": f"The server returned an error. Status: {response.status_code} {error_message}"
-            }
-
-        html = response.text
-
-        # Try trafilatura first (best quality)
-        content = trafilatura.extract(
-            html,
-            include_comments=False,
-            include_tables=True,
-            no_fallback=False
-        )
-
-        if content:
-            # Extract metadata
-            metadata = trafilatura.extract_metadata(html)
-            title = metadata.title if metadata and metadata.title else "Untitled"
-            author = metadata.author if metadata and metadata.author else None
-
-            # Convert to requested format
-            if input.format == "markdown":
-                # trafilatura can output markdown directly, but html2text gives better formatting
-                h = html2text.HTML2Text()
-                h.ignore_links = False
-                h.body_width = 0  # Don't wrap lines
-                # First get HTML from trafilatura with better structure
-                html_content = trafilatura.extract(html, include_comments=False, include_tables=True, output_format="xml")
-                if html_content:
-                    content = h.handle(html_content)
-                else:
-                    content = h.handle(content)
-            elif input.format == "text":
-                content = trafilatura.extract(html, no_fallback=False, output_format="txt")
-
-            print(f"[Fetch] Extracted {len(content)} chars using trafilatura")
-
-        else:
-            # Fallback to readability
-            print("[Fetch] Trafilatura failed, falling back to readability")
-            doc = Document(html)
-            title = doc.title()
-            content_html = doc.summary()
-            author = None
-
-            if input.format == "markdown":
-                h = html2text.HTML2Text()
-                h.ignore_links = False
-                h.body_width = 0
-                content = h.handle(content_html)
-            elif input.format == "text":
-                # Strip HTML tags for text
-                h = html2text.HTML2Text()
-                h.ignore_links = True
-                h.ignore_images = True
-                content = h.handle(content_html)
-            else:  # html
-                content = content_html
-
-            print(f"[Fetch] Extracted {len(content)} chars using readability")
-
-        # Truncate if needed
-        if len(content) > input.max_length:
-            content = content[:input.max_length] + "\n\n[Content truncated...]"
-            print(f"[Fetch] Truncated to {input.max_length} chars")
-
-        return {
+        with response:
+            # Check for HTTP errors - return immediately without processing body
+            if response.status_code >= 400:
+                error_message = response.reason
+                # Check for error message in common headers
+                if 'X-Error-Message' in response.headers:
+                    error_message = response.headers['X-Error-Message']
+                elif 'X-Error' in response.headers:
+                    error_message = response.headers['X-Error']
+
+                print(f"[Fetch] HTTP Error {response.status_code}: {error_message}")
+                return {
+                    "error": f"HTTP {response.status_code}: {error_message}",
+                    "status_code": response.status_code,
+                    "url": str(input.url),
+                    "message": f"The server returned an error. Status: {response.status_code} {error_message}"
+                }
+
+            # Extraction is the expensive part; skip it if the caller has given up
+            check_deadline()
+            content_type = response.headers.get("Content-Type", "")
+            report_progress(1, 3, f"Downloading and extracting {content_type or 'untyped'} response")
+
+            # The extractor is chosen by content type (see src/services/extractors.py)
+            extractor, extraction = extract(response, str(input.url), input.format)
+            title, content, author = extraction.title, extraction.content, extraction.author
+
+        report_progress(2, 3, f"Extracted {len(content)} chars", partial={"title": title, "excerpt": content[:1000]})
+
+        # Truncate if needed, keeping the full text so fetch_more can page through it
+        cursor = None
+        total_length = len(content)
+        if total_length > input.max_length:
+            doc_id = document_store.put(str(input.url), title, content, input.format) if store else None
+            content = content[:input.max_length]
+            if doc_id:
+                cursor = make_cursor(doc_id, input.max_length)
+                content += "\n\n[Content truncated... call fetch_more with the cursor to continue]"
+            else:
+                content += "\n\n[Content truncated...]"
+            print(f"[Fetch] Truncated to {input.max_length} of {total_length} chars")
+
+        result = {
             "url": str(input.url),
             "title": title,
             "content": content,
             "excerpt": content[:200] + "..." if len(content) > 200 else content,
             "author": author,
             "length": len(content),
-            "format": input.format
+            "format": input.format,
+            "content_type": content_type.split(";")[0].strip() or None,
+            "extractor": extractor
         }
+        if cursor:
+            result["total_length"] = total_length
+            result["cursor"] = cursor
+        return result
 
+    except HostUnavailable as e:
+        print(f"[Fetch] Skipped: {e}")
+        return {
+            "error": str(e),
+            "url": str(input.url),
+            "retry_after": round(e.retry_in, 1),
+            "message": "The site is currently failing or rate-limiting requests. Do not retry it right away."
+        }
+    except BodyTooLarge as e:
+        print(f"[Fetch] Error: {e}")
+        return {
+            "error": str(e),
+            "url": str(input.url),
+            "message": "The document is too large to extract."
+        }
     except requests.exceptions.RequestException as e:
         error_msg = f"HTTP request failed: {str(e)}"
         print(f"[Fetch] Error: {error_msg}")
@@ -155,6 +163,9 @@ async def fetch_tool(input: FetchInput) -> dict:
             "url": str(input.url),
             "message": "Failed to fetch the URL. Please check if the URL is accessible."
         }
+    except (DeadlineExceeded, asyncio.TimeoutError):
+        # Not a page failure: the server answers these as deadline errors
+        raise
     except Exception as e:
         error_msg = str(e)
         print(f"[Fetch] Error: {error_msg}")
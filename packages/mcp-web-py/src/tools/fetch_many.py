@@ -0,0 +1,152 @@
+"""Concurrent multi-URL Fetch Tool"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Literal
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field, HttpUrl
+
+from src.tools.fetch import FetchInput, fetch_page
+from agentic_shared.progress import report_progress, reporting_to
+from agentic_shared.admission import DeadlineExceeded, clamp_timeout, remaining
+
+
+# Limits are process-wide so that parallel fetch_many calls from several chat
+# sessions cannot together exceed them.
+FETCH_MANY_CONCURRENCY = int(os.environ.get("FETCH_MANY_CONCURRENCY", 8))
+FETCH_MANY_PER_HOST = int(os.environ.get("FETCH_MANY_PER_HOST", 2))
+
+# Share of the caller's remaining time kept for returning partial results, capped
+_RESERVE_FRACTION = 0.1
+_MAX_RESERVE = 0.5
+
+
+class FetchManyInput(BaseModel):
+    """Input schema for concurrent multi-URL fetch"""
+    urls: list[HttpUrl] = Field(..., min_length=1, max_length=20, description="URLs to fetch (1-20)")
+    format: Literal["markdown", "html", "text"] = Field("markdown", description="Output format")
+    max_length: int = Field(20000, ge=1, le=100000, description="Maximum content length per page in characters")
+    deadline: float = Field(20.0, gt=0, le=60, description="Overall deadline in seconds")
+
+
+class _HostLimiter:
+    """Per-host semaphores that are dropped again once a host goes idle."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._hosts: dict[str, list] = {}  # host -> [semaphore, users]
+
+    @asynccontextmanager
+    async def acquire(self, host: str):
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.limit), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._hosts.pop(host, None)
+
+
+_global_limit = asyncio.Semaphore(FETCH_MANY_CONCURRENCY)
+_host_limits = _HostLimiter(FETCH_MANY_PER_HOST)
+
+
+async def _fetch_limited(input: FetchInput, store: bool) -> dict:
+    host = urlsplit(str(input.url)).hostname or ""
+    async with _host_limits.acquire(host):
+        async with _global_limit:
+            # Progress is reported per page by fetch_many_tool, not per stage
+            with reporting_to(None):
+                return await asyncio.to_thread(fetch_page, input, store)
+
+
+async def fetch_many_tool(input: FetchManyInput, store: bool = True) -> dict:
+    """
+    Fetch and extract several web pages concurrently.
+
+    Downloads and extraction run in worker threads, bounded by a global limit
+    and a per-host limit. Results are returned in input order; URLs that fail
+    or are still running when the deadline expires are reported individually
+    while the remaining pages are returned as usual. Abandoned downloads finish
+    in the background but their results are discarded. *store* is passed on to
+    fetch_page.
+    """
+    start_time = time.time()
+    print(f"[FetchMany] {len(input.urls)} URLs, Format: {input.format}, Deadline: {input.deadline}s")
+
+    finished = 0
+
+    def on_page_done(task: asyncio.Task) -> None:
+        # Stream each finished page as partial content
+        nonlocal finished
+        if task.cancelled() or task.exception() is not None:
+            return
+        finished += 1
+        result = task.result()
+        report_progress(finished, len(tasks), f"Fetched {result.get('url')}", partial=result)
+
+    # Identical URLs are fetched once and share the result
+    tasks: dict[str, asyncio.Task] = {}
+    for url in input.urls:
+        key = str(url)
+        if key not in tasks:
+            page_input = FetchInput(url=url, format=input.format, max_length=input.max_length)
+            task = tasks[key] = asyncio.create_task(_fetch_limited(page_input, store))
+            task.add_done_callback(on_page_done)
+
+    # Leave time to return partial results before the caller's own deadline.
+    # The reserve scales with what is left so that short deadlines still fetch.
+    left = remaining()
+    reserve = 0.0 if left is None else min(_MAX_RESERVE, max(0.0, left) * _RESERVE_FRACTION)
+    deadline = clamp_timeout(input.deadline, reserve=reserve)
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    results = []
+    succeeded = failed = timed_out = 0
+    for url in input.urls:
+        key = str(url)
+        task = tasks[key]
+        if task in pending or isinstance(task.exception(), DeadlineExceeded):
+            timed_out += 1
+            results.append({
+                "error": f"Deadline of {deadline:.1f}s exceeded",
+                "url": key,
+                "message": "The page did not load before the overall deadline."
+            })
+            continue
+
+        exc = task.exception()
+        if exc is not None:
+            result = {
+                "error": str(exc),
+                "url": key,
+                "message": "Content extraction failed. The page format may not be supported."
+            }
+        else:
+            result = task.result()
+
+        if "error" in result:
+            failed += 1
+        else:
+            succeeded += 1
+        results.append(result)
+
+    elapsed = (time.time() - start_time) * 1000
+    print(f"[FetchMany] {succeeded} ok, {failed} failed, {timed_out} timed out in {elapsed:.2f}ms")
+
+    return {
+        "results": results,
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": failed,
+        "timed_out": timed_out,
+        "format": input.format,
+        "response_time": round(elapsed, 2)
+    }
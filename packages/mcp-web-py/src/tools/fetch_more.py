@@ -0,0 +1,88 @@
+"""Continue reading a truncated fetch result from the server-side document store"""
+import re
+from typing import Optional
+from pydantic import BaseModel, Field
+
+from src.services.document_store import document_store, make_cursor, parse_cursor
+
+
+# When jumping to a search term, start the slice at a paragraph break up to
+# this many characters before the match so it keeps some context.
+_FIND_CONTEXT_CHARS = 500
+
+
+class FetchMoreInput(BaseModel):
+    """Input schema for continuing a truncated fetch"""
+    cursor: str = Field(..., min_length=1, description="Cursor returned by fetch, fetch_many or a previous fetch_more")
+    max_length: int = Field(20000, ge=1, le=100000, description="Maximum slice length in characters")
+    find: Optional[str] = Field(None, min_length=1, description="Return the slice around the next occurrence of this text")
+
+
+def _find_start(content: str, term: str, offset: int) -> Optional[int]:
+    """Position to start a slice for the next match of term at/after offset, wrapping once."""
+    # Matched on content itself: casefold() can change the length (ß -> ss),
+    # which would shift every index after such a character
+    pattern = re.compile(re.escape(term), re.IGNORECASE)
+    found = pattern.search(content, offset) or pattern.search(content)
+    if found is None:
+        return None
+    match = found.start()
+    window_start = max(0, match - _FIND_CONTEXT_CHARS)
+    paragraph = content.rfind("\n\n", window_start, match)
+    return paragraph + 2 if paragraph >= 0 else window_start
+
+
+async def fetch_more_tool(input: FetchMoreInput) -> dict:
+    """
+    Return the next slice of a previously fetched document.
+
+    fetch keeps the full extracted text of truncated pages in a TTL-bounded
+    store and returns a cursor. This tool slices that text directly, either
+    continuing at the cursor or jumping to the next occurrence of a search
+    term, without any network or extraction work.
+    """
+    try:
+        doc_id, offset = parse_cursor(input.cursor)
+    except ValueError as e:
+        return {
+            "error": str(e),
+            "message": "Pass the cursor exactly as returned by fetch or fetch_more."
+        }
+
+    doc = document_store.get(doc_id)
+    if doc is None:
+        print(f"[FetchMore] Cursor expired: {input.cursor}")
+        return {
+            "error": "Cursor expired or unknown",
+            "cursor": input.cursor,
+            "message": "The stored document is no longer available. Fetch the URL again."
+        }
+
+    content = doc.content
+    if input.find:
+        start = _find_start(content, input.find, offset)
+        if start is None:
+            return {
+                "error": f"'{input.find}' not found in document",
+                "url": doc.url,
+                "cursor": input.cursor,
+                "message": "The search term does not occur in the document. Continue with the cursor instead."
+            }
+    else:
+        start = min(offset, len(content))
+
+    end = min(start + input.max_length, len(content))
+    print(f"[FetchMore] {doc.url} [{start}:{end}] of {len(content)}")
+
+    result = {
+        "url": doc.url,
+        "title": doc.title,
+        "content": content[start:end],
+        "offset": start,
+        "length": end - start,
+        "total_length": len(content),
+        "format": doc.format
+    }
+    if end < len(content):
+        result["cursor"] = make_cursor(doc_id, end)
+    return result
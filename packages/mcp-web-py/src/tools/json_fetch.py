@@ -1,9 +1,29 @@
 """JSON Fetch Tool"""
+import asyncio
+import itertools
+import os
+import re
+from decimal import Decimal
 from typing import Literal, Optional
 from pydantic import BaseModel, Field, HttpUrl
+import ijson
 import requests
 import time
 
+from src.services.outbound import guarded_request, HostUnavailable
+from agentic_shared.admission import DeadlineExceeded, clamp_timeout
+
+
+# Upper bound on response body bytes read from the network per call
+JSON_FETCH_MAX_BYTES = int(os.environ.get("JSON_FETCH_MAX_BYTES", 2_000_000))
+
+# Bytes kept from the start of the body for the non-JSON fallback
+_RAW_HEAD_BYTES = 20_000
+
+_PATH_TOKEN_RE = re.compile(r"""\.?([A-Za-z_$][\w$-]*)|\[\s*'([^']*)'\s*\]|\[\s*"([^"]*)"\s*\]|(\[\s*\*\s*\]|\.\*)""")
+# ijson prefixes cannot pick one array element, so [n] is rejected with a hint
+_PATH_INDEX_RE = re.compile(r"\[\s*-?\d+\s*\]")
+
 
 class JsonFetchInput(BaseModel):
     """Input schema for JSON fetch"""
@@ -11,6 +31,123 @@ class JsonFetchInput(BaseModel):
     method: Literal["GET", "POST", "PUT", "DELETE"] = Field("GET", description="HTTP method")
     headers: Optional[dict[str, str]] = Field(None, description="Custom headers (e.g., Authorization)")
     body: Optional[str] = Field(None, description="Request body as JSON string")
+    path: Optional[str] = Field(None, description="JSONPath-style projection, e.g. $.items[*].name (no [n] indexes)")
+    limit: Optional[int] = Field(None, ge=1, le=1000, description="Maximum number of matched values to return")
+    offset: int = Field(0, ge=0, description="Number of matched values to skip")
+    max_bytes: int = Field(JSON_FETCH_MAX_BYTES, ge=1, le=20_000_000, description="Maximum response body size in bytes")
+    include_headers: bool = Field(False, description="Include response headers in the result")
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class _CappedReader:
+    """File-like wrapper over a streamed body that enforces a byte cap."""
+
+    def __init__(self, raw, max_bytes: int):
+        self._raw = raw
+        self._max_bytes = max_bytes
+        self.bytes_read = 0
+        self.head = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson probes with read(0) to detect bytes vs str
+            return b""
+        chunk = self._raw.read(size if size > 0 else 65536)
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self._max_bytes:
+            raise ResponseTooLarge(f"Response body exceeds {self._max_bytes} bytes")
+        if len(self.head) < _RAW_HEAD_BYTES:
+            self.head += chunk[:_RAW_HEAD_BYTES - len(self.head)]
+        return chunk
+
+
+def path_to_prefix(path: str) -> tuple[str, bool]:
+    """
+    Translate a JSONPath-style expression into an ijson prefix.
+
+    Supports $, .key, ['key'], ["key"] and [*] / .* for "every element".
+    Array indexes ([n]) are not supported; [*] with offset/limit selects
+    elements instead. Returns (prefix, multi) where multi is true when the
+    path can match more than one value. Raises ValueError for other syntax.
+    """
+    expr = path.strip()
+    if expr.startswith("$"):
+        expr = expr[1:]
+    parts: list[str] = []
+    multi = False
+    pos = 0
+    while pos < len(expr):
+        m = _PATH_TOKEN_RE.match(expr, pos)
+        index = _PATH_INDEX_RE.match(expr, pos)
+        if index:
+            raise ValueError(
+                f"Array index '{index.group()}' is not supported; "
+                "use [*] with offset and limit to select elements"
+            )
+        if not m or m.end() == pos:
+            raise ValueError(f"Unsupported path syntax at '{expr[pos:]}' (use .key, ['key'] or [*])")
+        if m.group(4):
+            parts.append("item")
+            multi = True
+        else:
+            parts.append(next(g for g in m.groups()[:3] if g is not None))
+        pos = m.end()
+    return ".".join(parts), multi
+
+
+def _plain(value):
+    """Turn the Decimals ijson yields for non-integers into floats, as json.loads would."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _read_json(response: requests.Response, input: JsonFetchInput) -> dict:
+    """Incrementally parse the body, applying projection and paging as we go."""
+    reader = _CappedReader(response.raw, input.max_bytes)
+    response.raw.decode_content = True
+
+    paged = input.limit is not None or input.offset > 0
+    if input.path:
+        prefix, multi = path_to_prefix(input.path)
+    else:
+        # Without a path, paging applies to a top-level array
+        prefix, multi = ("item", True) if paged else ("", False)
+
+    try:
+        # Not use_float: the C backend then rejects integers wider than 64 bits
+        values = map(_plain, ijson.items(reader, prefix))
+        if not multi and not paged:
+            # Single value: stop reading as soon as it is complete
+            data = next(values, None)
+            return {"data": data, "bytes_read": reader.bytes_read}
+
+        stop = None if input.limit is None else input.offset + input.limit + 1
+        page = list(itertools.islice(values, input.offset, stop))
+        has_more = input.limit is not None and len(page) > input.limit
+        if has_more:
+            page = page[:input.limit]
+        return {
+            "data": page,
+            "count": len(page),
+            "offset": input.offset,
+            "has_more": has_more,
+            "bytes_read": reader.bytes_read
+        }
+    except ijson.JSONError:
+        # Not JSON, return the start of the raw text
+        text = reader.head.decode(response.encoding or "utf-8", errors="replace")
+        return {
+            "data": {"_raw": text, "_note": "Response was not valid JSON"},
+            "bytes_read": reader.bytes_read
+        }
 
 
 async def json_fetch_tool(input: JsonFetchInput) -> dict:
@@ -18,11 +155,27 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
     Fetch JSON data from remote APIs.
 
     Supports all HTTP methods, custom headers for authentication,
-    and handles non-JSON responses gracefully.
+    and handles non-JSON responses gracefully. The body is parsed as a stream:
+    an optional path projects the document and limit/offset page the matched
+    values, so only what was asked for is held in memory and reading stops
+    as soon as the requested values are complete.
     """
     try:
         print(f"[JSONFetch] {input.method} {input.url}")
 
+        if input.path:
+            # Validate before touching the network
+            try:
+                path_to_prefix(input.path)
+            except ValueError as e:
+                print(f"[JSONFetch] Invalid path: {e}")
+                return {
+                    "error": f"Invalid path: {e}",
+                    "url": str(input.url),
+                    "path": input.path,
+                    "message": "Fix the path and retry. Supported: .key, ['key'] and [*]; pick array elements with [*] plus offset and limit."
+                }
+
         start_time = time.time()
 
         # Prepare headers
@@ -33,53 +186,73 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
         if input.headers:
             headers.update(input.headers)
 
-        # Make request
-        response = requests.request(
-            method=input.method,
-            url=str(input.url),
+        # Make request (in a worker thread so the event loop stays responsive)
+        response = await asyncio.to_thread(
+            guarded_request,
+            input.method,
+            str(input.url),
             headers=headers,
             data=input.body if input.body else None,
-            timeout=10
+            timeout=clamp_timeout(10),
+            stream=True
         )
 
-        response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-
-        print(f"[JSONFetch] Status: {response.status_code}, Time: {response_time:.2f}ms")
-
-        # Check for HTTP errors - return immediately without processing body
-        if response.status_code >= 400:
-            error_message = response.reason
-            # Check for error message in common headers
-            if 'X-Error-Message' in response.headers:
-                error_message = response.headers['X-Error-Message']
-            elif 'X-Error' in response.headers:
-                error_message = response.headers['X-Error']
-
-            print(f"[JSONFetch] HTTP Error {response.status_code}: {error_message}")
-            return {
-                "error": f"HTTP {response.status_code}: {error_message}",
-                "status_code": response.status_code,
-                "url": str(input.url),
-                "message": f"The API returned an error. Status: {response.status_code} {error_message}",
-                "response_time": round(response_time, 2)
-            }
-
-        # Try to parse as JSON
-        try:
-            data = response.json()
-        except ValueError:
-            # Not JSON, return raw text
-            data = {"_raw": response.text, "_note": "Response was not valid JSON"}
+        with response:
+            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
 
-        return {
+            print(f"[JSONFetch] Status: {response.status_code}, Time: {response_time:.2f}ms")
+
+            # Check for HTTP errors - return immediately without processing body
+            if response.status_code >= 400:
+                error_message = response.reason
+                # Check for error message in common headers
+                if 'X-Error-Message' in response.headers:
+                    error_message = response.headers['X-Error-Message']
+                elif 'X-Error' in response.headers:
+                    error_message = response.headers['X-Error']
+
+                print(f"[JSONFetch] HTTP Error {response.status_code}: {error_message}")
+                return {
+                    "error": f"HTTP {response.status_code}: {error_message}",
+                    "status_code": response.status_code,
+                    "url": str(input.url),
+                    "message": f"The API returned an error. Status: {response.status_code} {error_message}",
+                    "response_time": round(response_time, 2)
+                }
+
+            parsed = await asyncio.to_thread(_read_json, response, input)
+
+        response_time = (time.time() - start_time) * 1000
+        print(f"[JSONFetch] Parsed {parsed['bytes_read']} bytes in {response_time:.2f}ms")
+
+        result = {
             "url": str(input.url),
             "status_code": response.status_code,
             "status_text": response.reason,
-            "headers": dict(response.headers),
-            "data": data,
-            "response_time": round(response_time, 2)
         }
+        if input.include_headers:
+            result["headers"] = dict(response.headers)
+        if input.path:
+            result["path"] = input.path
+        result.update(parsed)
+        result["response_time"] = round(response_time, 2)
+        return result
 
+    except ResponseTooLarge as e:
+        print(f"[JSONFetch] Error: {e}")
+        return {
+            "error": str(e),
+            "url": str(input.url),
+            "message": "The response is too large. Use path, limit and offset to select only the data you need, or raise max_bytes."
+        }
+    except HostUnavailable as e:
+        print(f"[JSONFetch] Skipped: {e}")
+        return {
+            "error": str(e),
+            "url": str(input.url),
+            "retry_after": round(e.retry_in, 1),
+            "message": "The API is currently failing or rate-limiting requests. Do not retry it right away."
+        }
     except requests.exceptions.Timeout:
         error_msg = "Request timed out after 10 seconds"
         print(f"[JSONFetch] Error: {error_msg}")
@@ -96,6 +269,8 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
             "url": str(input.url),
             "message": "Failed to connect to the API endpoint."
         }
+    except (DeadlineExceeded, asyncio.TimeoutError):
+        raise
     except Exception as e:
         error_msg = str(e)
         print(f"[JSONFetch] Error: {error_msg}")
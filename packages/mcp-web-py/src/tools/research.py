@@ -0,0 +1,202 @@
+"""Search-and-read Research Tool built on search and fetch_many"""
+import math
+import re
+import time
+from collections import Counter
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter, ValidationError
+
+from src.tools.search import search_tool, SearchInput
+from src.tools.fetch_many import fetch_many_tool, FetchManyInput
+from agentic_shared.progress import report_progress, reporting_to
+
+
+# Passages are built from whole paragraphs up to roughly this many characters
+PASSAGE_TARGET_CHARS = 700
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_HTTP_URL = TypeAdapter(HttpUrl)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to was what when where which who why with".split()
+)
+
+
+class ResearchInput(BaseModel):
+    """Input schema for search-and-read research"""
+    query: str = Field(..., min_length=1, description="Research question or search query")
+    top_k: int = Field(5, ge=1, le=10, description="Number of top search results to read (1-10)")
+    max_chars: int = Field(8000, ge=500, le=30000, description="Total character budget for returned passages")
+    max_passages: int = Field(8, ge=1, le=30, description="Maximum number of passages to return")
+    region: str = Field("wt-wt", description="Region code (us-en, uk-en, wt-wt for worldwide)")
+    backend: str = Field("auto", description="Search backend (auto for parallel metasearch)")
+    deadline: float = Field(15.0, gt=0, le=60, description="Deadline in seconds for fetching the result pages")
+
+
+def _is_fetchable(url: str) -> bool:
+    # Search engines occasionally return URLs fetch_many would reject
+    try:
+        _HTTP_URL.validate_python(url)
+    except ValidationError:
+        return False
+    return True
+
+
+def _tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def split_passages(text: str, target_chars: int = PASSAGE_TARGET_CHARS) -> list[str]:
+    """Split extracted page text into passages of whole paragraphs."""
+    passages: list[str] = []
+    current = ""
+    for para in re.split(r"\n\s*\n+|\n(?=[#*-] )", text):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) > target_chars * 2:
+            # Very long paragraph: cut on sentence boundaries
+            for sentence in re.split(r"(?<=[.!?])\s+", para):
+                if current and len(current) + len(sentence) > target_chars:
+                    passages.append(current)
+                    current = ""
+                current = f"{current} {sentence}" if current else sentence
+            continue
+        if current and len(current) + len(para) > target_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n\n{para}" if current else para
+    if current:
+        passages.append(current)
+    return passages
+
+
+def rank_passages(query: str, passages: list[str]) -> list[float]:
+    """Score passages against the query with Okapi BM25."""
+    query_terms = set(_tokenize(query))
+    if not passages or not query_terms:
+        return [0.0] * len(passages)
+
+    docs = [Counter(_tokenize(p)) for p in passages]
+    lengths = [sum(d.values()) for d in docs]
+    avg_len = (sum(lengths) / len(lengths)) or 1.0
+    n = len(docs)
+
+    idf = {}
+    for term in query_terms:
+        df = sum(1 for d in docs if term in d)
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for doc, length in zip(docs, lengths):
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (BM25_K1 + 1) / (
+                    tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+                )
+        scores.append(score)
+    return scores
+
+
+async def research_tool(input: ResearchInput) -> dict:
+    """
+    Search the web, read the top results and return the most relevant passages.
+
+    Runs search_tool, fetches the top-k result pages concurrently with
+    fetch_many_tool (without keeping long pages for fetch_more, since no
+    cursor is returned), splits the extracted text into passages and ranks them
+    against the query locally with BM25. Only the best passages that fit in
+    max_chars are returned, so one call replaces a search plus several fetches.
+    """
+    start_time = time.time()
+    print(f"[Research] Query: {input.query}, Top-k: {input.top_k}, Budget: {input.max_chars}")
+
+    report_progress(0, 3, "Searching")
+    with reporting_to(None):
+        search_result = await search_tool(SearchInput(
+            query=input.query,
+            max_results=input.top_k,
+            region=input.region,
+            backend=input.backend
+        ))
+    if "error" in search_result:
+        return search_result
+
+    hits = [r for r in search_result["results"] if r.get("url")][:input.top_k]
+    if not hits:
+        return {
+            "query": input.query,
+            "passages": [],
+            "sources": [],
+            "count": 0,
+            "message": "No search results found."
+        }
+
+    report_progress(1, 3, f"Reading {len(hits)} pages", partial={"sources": hits})
+    fetchable = [hit["url"] for hit in hits if _is_fetchable(hit["url"])]
+    pages = {}
+    if fetchable:
+        with reporting_to(None):
+            fetched = await fetch_many_tool(FetchManyInput(
+                urls=fetchable,
+                format="text",
+                max_length=100000,
+                deadline=input.deadline
+            ), store=False)
+        pages = dict(zip(fetchable, fetched["results"]))
+    report_progress(2, 3, "Ranking passages")
+
+    sources = []
+    candidates = []  # (position, url, title, passage)
+    for hit in hits:
+        source = {"position": hit["position"], "url": hit["url"], "title": hit["title"]}
+        page = pages.get(hit["url"], {"error": "Not a valid http(s) URL"})
+        if "error" in page:
+            source["error"] = page["error"]
+        else:
+            for passage in split_passages(page.get("content") or ""):
+                candidates.append((hit["position"], hit["url"], page.get("title") or hit["title"], passage))
+        sources.append(source)
+
+    scores = rank_passages(input.query, [c[3] for c in candidates])
+    # Prefer higher-ranked search results when BM25 scores tie
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i], candidates[i][0]))
+
+    passages = []
+    seen: set[str] = set()
+    used_chars = 0
+    for i in order:
+        if len(passages) >= input.max_passages or scores[i] <= 0:
+            break
+        position, url, title, text = candidates[i]
+        fingerprint = " ".join(text.lower().split())[:200]
+        if fingerprint in seen:
+            continue
+        if used_chars + len(text) > input.max_chars:
+            continue
+        seen.add(fingerprint)
+        used_chars += len(text)
+        passages.append({
+            "url": url,
+            "title": title,
+            "position": position,
+            "score": round(scores[i], 3),
+            "text": text
+        })
+
+    elapsed = (time.time() - start_time) * 1000
+    print(f"[Research] {len(passages)} passages ({used_chars} chars) from {len(candidates)} candidates in {elapsed:.2f}ms")
+
+    return {
+        "query": input.query,
+        "passages": passages,
+        "sources": sources,
+        "count": len(passages),
+        "total_chars": used_chars,
+        "response_time": round(elapsed, 2)
+    }
@@ -1,6 +1,28 @@
 """Web Search Tool using DDGS"""
+import asyncio
+import os
 from pydantic import BaseModel, Field
-from ddgs import DDGS
+from ddgs.exceptions import DDGSException, RatelimitException, TimeoutException
+
+from src.services.cache import TTLCache
+from src.services.search_runner import run_search
+from agentic_shared.admission import DeadlineExceeded
+from agentic_shared.progress import report_progress
+
+
+# Search results are cached per (query, region, backend, max_results).
+# Concurrent identical searches share one upstream call, and when upstream is
+# rate-limited or times out an expired entry is served for up to
+# SEARCH_CACHE_STALE_TTL more seconds. SEARCH_CACHE_TTL=0 disables caching.
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", 300))
+SEARCH_CACHE_STALE_TTL = float(os.environ.get("SEARCH_CACHE_STALE_TTL", 3600))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 500))
+
+search_cache = TTLCache(
+    ttl=SEARCH_CACHE_TTL,
+    stale_ttl=SEARCH_CACHE_STALE_TTL,
+    max_entries=SEARCH_CACHE_MAX_ENTRIES
+)
 
 
 class SearchInput(BaseModel):
@@ -11,31 +33,56 @@ class SearchInput(BaseModel):
     backend: str = Field("auto", description="Search backend (auto for parallel metasearch)")
 
 
+def _cache_key(input: SearchInput) -> tuple:
+    # Search engines ignore case and extra whitespace, so neither splits the cache
+    query = " ".join(input.query.split()).casefold()
+    return (query, input.region, input.backend, input.max_results)
+
+
+# ddgs 9.x raises a plain DDGSException when every engine failed: engines that
+# are rate-limited answer with a non-200 status, which ddgs reports only as
+# "No results found.", and transport errors carry the client's error text.
+_THROTTLED_MESSAGES = ("no results found", "ratelimit", "rate limit", "429", "202", "timed out", "timeout")
+
+
+def _is_upstream_throttled(exc: Exception) -> bool:
+    if isinstance(exc, (RatelimitException, TimeoutException)):
+        return True
+    return isinstance(exc, DDGSException) and any(m in str(exc).lower() for m in _THROTTLED_MESSAGES)
+
+
+async def _run_search(input: SearchInput) -> list[dict]:
+    """Run one upstream DDGS metasearch and return the raw result list."""
+    return await run_search(
+        query=input.query,
+        region=input.region,
+        backend=input.backend,
+        max_results=input.max_results
+    )
+
+
 async def search_tool(input: SearchInput) -> dict:
     """
     Search the web using DDGS metasearch library.
 
     DDGS searches multiple backends (DuckDuckGo, Bing, Brave, Google) in parallel
     when backend="auto", providing more reliable and comprehensive results.
+    Results are served from a TTL cache when possible (see SEARCH_CACHE_TTL);
+    upstream searches run on a worker pool and are hedged when slow.
     """
     try:
         print(f"[Search] Query: {input.query}, Region: {input.region}, Backend: {input.backend}, Max: {input.max_results}")
 
-        # DDGS() returns a context manager, use with statement
-        # Note: DDGS handles user-agent internally with realistic browser headers
-        with DDGS() as ddgs:
-            results = ddgs.text(
-                query=input.query,  # Changed from 'keywords' to 'query'
-                region=input.region,
-                safesearch="off",
-                max_results=input.max_results,
-                backend=input.backend
-            )
-            results_list = list(results)
+        report_progress(0, 1, f"Searching for '{input.query}'")
+        results_list, cache_status = await search_cache.get_or_load(
+            _cache_key(input),
+            lambda: _run_search(input),
+            serve_stale=_is_upstream_throttled
+        )
 
-        print(f"[Search] Found {len(results_list)} results")
+        print(f"[Search] Found {len(results_list)} results (cache: {cache_status})")
 
-        return {
+        result = {
             "query": input.query,
             "results": [
                 {
@@ -49,8 +96,14 @@ async def search_tool(input: SearchInput) -> dict:
             ],
             "count": len(results_list),
             "backend": input.backend,
-            "region": input.region
+            "region": input.region,
+            "cache": cache_status
         }
+        if cache_status == "stale":
+            result["message"] = "Search engines are rate-limiting; these are earlier cached results."
+        return result
+    except (DeadlineExceeded, asyncio.TimeoutError):
+        raise
     except Exception as e:
         error_msg = str(e)
         print(f"[Search] Error: {error_msg}")
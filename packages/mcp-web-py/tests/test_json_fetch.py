@@ -0,0 +1,32 @@
+import pytest
+
+from src.tools.json_fetch import JsonFetchInput, json_fetch_tool, path_to_prefix
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("$", ("", False)),
+    ("$.data.total", ("data.total", False)),
+    ("$['data'].items[*].name", ("data.items.item.name", True)),
+    ("$.*", ("item", True)),
+])
+def test_path_to_prefix(path, expected):
+    assert path_to_prefix(path) == expected
+
+
+@pytest.mark.parametrize("path", ["$.items[0]", "$.items[ 2 ].name", "$[-1]"])
+def test_array_indexes_are_rejected(path):
+    with pytest.raises(ValueError, match="not supported; use \\[\\*\\] with offset and limit"):
+        path_to_prefix(path)
+
+
+@pytest.mark.asyncio
+async def test_invalid_path_is_reported_before_fetching(monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("fetched despite an invalid path")
+
+    monkeypatch.setattr("src.tools.json_fetch.guarded_request", no_network)
+
+    result = await json_fetch_tool(JsonFetchInput(url="https://api.example.com/items", path="$.items[0]"))
+
+    assert result["error"].startswith("Invalid path: Array index '[0]'")
+    assert result["path"] == "$.items[0]"
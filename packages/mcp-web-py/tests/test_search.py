@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from ddgs.ddgs import DDGS  # the class itself; ddgs.DDGS is a lazy-loading proxy
+from ddgs.exceptions import DDGSException
+
+from src.services import search_runner
+from src.services.cache import TTLCache
+from src.tools import search
+from src.tools.search import SearchInput, search_tool
+
+
+RESULTS = [{"title": "Unicity", "href": "https://unicity.network/", "body": "Unicity Network"}]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route DDGS.text through a list of outcomes: result lists or exceptions to raise."""
+    outcomes = []
+
+    def text(self, query, **kwargs):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(DDGS, "text", text)
+    monkeypatch.setattr(search_runner, "SEARCH_HEDGE_DELAY_MS", 0)
+    monkeypatch.setattr(search, "search_cache", TTLCache(ttl=0.05, stale_ttl=60))
+    return outcomes
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_search_serves_stale_results(upstream):
+    # ddgs 9.x reports engines that were refused (HTTP 202/429) only as this
+    upstream.extend([RESULTS, DDGSException("No results found.")])
+    query = SearchInput(query="unicity network")
+
+    first = await search_tool(query)
+    await asyncio.sleep(0.1)
+    second = await search_tool(query)
+
+    assert first["cache"] == "miss"
+    assert second["cache"] == "stale"
+    assert second["results"] == first["results"]
+
+
+@pytest.mark.asyncio
+async def test_other_upstream_errors_are_reported(upstream):
+    upstream.extend([RESULTS, DDGSException("ConnectError: error sending request")])
+    query = SearchInput(query="unicity network")
+
+    await search_tool(query)
+    await asyncio.sleep(0.1)
+    result = await search_tool(query)
+
+    assert "error" in result
+    assert "results" not in result
+
+
+def test_is_upstream_throttled():
+    assert search._is_upstream_throttled(DDGSException("No results found."))
+    assert search._is_upstream_throttled(DDGSException("RatelimitException: 202 Ratelimit"))
+    assert not search._is_upstream_throttled(DDGSException("query is mandatory."))
+    assert not search._is_upstream_throttled(ValueError("No results found."))
@@ -0,0 +1 @@
+"""Transport building blocks shared by the Python MCP servers (mcp-web-py, mcp-rag)."""
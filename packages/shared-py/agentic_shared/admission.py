@@ -0,0 +1,221 @@
+"""Per-request deadlines and admission control for tool calls"""
+import asyncio
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+
+# Tool calls running at once; beyond that calls wait in a priority queue. The
+# defaults are each server's (see configure()); the variables override them.
+MCP_MAX_CONCURRENT_CALLS = os.environ.get("MCP_MAX_CONCURRENT_CALLS")
+MCP_MAX_QUEUED_CALLS = os.environ.get("MCP_MAX_QUEUED_CALLS")
+# Applied when the caller sends no deadline (0 = no deadline)
+MCP_DEFAULT_TIMEOUT_MS = float(os.environ.get("MCP_DEFAULT_TIMEOUT_MS", 0))
+
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+# Header equivalents of _meta.timeoutMs and _meta.priority
+TIMEOUT_HEADER = "x-timeout-ms"
+PRIORITY_HEADER = "x-priority"
+
+
+class Overloaded(Exception):
+    """The call was shed because the server is at capacity."""
+
+
+class DeadlineExceeded(Exception):
+    """The caller's deadline passed before the call finished."""
+
+
+# ---------------------------------------------------------------------------
+# Deadlines
+# ---------------------------------------------------------------------------
+
+# Absolute time.monotonic() deadline of the current call; asyncio.to_thread
+# copies it into worker threads so blocking code can check it cooperatively.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def request_meta(headers) -> dict:
+    """_meta defaults taken from the HTTP headers of a POST /mcp request."""
+    meta = {}
+    if TIMEOUT_HEADER in headers:
+        meta["timeoutMs"] = headers[TIMEOUT_HEADER]
+    if PRIORITY_HEADER in headers:
+        meta["priority"] = headers[PRIORITY_HEADER]
+    return meta
+
+
+def parse_deadline(meta: dict) -> Optional[float]:
+    """Absolute deadline from _meta.timeoutMs (relative, so clock skew does not matter)."""
+    timeout_ms: Any = meta.get("timeoutMs") or MCP_DEFAULT_TIMEOUT_MS
+    try:
+        timeout_ms = float(timeout_ms)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid timeoutMs: {timeout_ms!r}")
+    if timeout_ms <= 0:
+        return None
+    return time.monotonic() + timeout_ms / 1000
+
+
+def parse_priority(meta: dict) -> int:
+    priority = meta.get("priority", "normal")
+    if isinstance(priority, str) and priority.lower() in PRIORITIES:
+        return PRIORITIES[priority.lower()]
+    raise ValueError(f"Invalid priority: {priority!r} (expected low, normal or high)")
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]):
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current call's deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the current call's deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+
+
+def clamp_timeout(timeout: float, reserve: float = 0.0) -> float:
+    """Shorten *timeout* so it ends *reserve* seconds before the current deadline."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(0.01, min(timeout, left - reserve))
+
+
+# ---------------------------------------------------------------------------
+# Admission control
+# ---------------------------------------------------------------------------
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "future")
+
+    def __init__(self, priority: int, seq: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded priority queue.
+
+    Up to *limit* calls run at once. Further calls wait, highest priority
+    first and FIFO within a priority, until a slot frees up or their deadline
+    passes. When the queue is full a new call displaces the newest waiter of
+    a lower priority, or is shed itself if there is none.
+    """
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self.stats = {"admitted": 0, "queued": 0, "shed": 0, "expired": 0}
+
+    def snapshot(self) -> dict:
+        return dict(self.stats, active=self.active, waiting=len(self._waiters),
+                    limit=self.limit, max_queue=self.max_queue)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITIES["normal"], deadline: Optional[float] = None):
+        await self._acquire(priority, deadline)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int, deadline: Optional[float]) -> None:
+        if deadline is not None and deadline <= time.monotonic():
+            self.stats["expired"] += 1
+            raise DeadlineExceeded("Deadline passed before the call was admitted")
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.stats["admitted"] += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            victim = min(self._waiters, key=lambda w: (w.priority, -w.seq), default=None)
+            if victim is None or victim.priority >= priority:
+                self.stats["shed"] += 1
+                raise Overloaded(f"Server busy: {self.active} calls running, {len(self._waiters)} queued")
+            self._waiters.remove(victim)
+            self.stats["shed"] += 1
+            victim.future.set_exception(Overloaded("Shed in favour of a higher-priority call"))
+
+        waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            async with asyncio.timeout(timeout):
+                await waiter.future
+        except TimeoutError:
+            self._abandon(waiter)
+            self.stats["expired"] += 1
+            raise DeadlineExceeded("Deadline passed while queued") from None
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+            # A slot was handed over just as the waiter gave up: pass it on
+            self._release()
+
+    def _release(self) -> None:
+        self.active -= 1
+        while self._waiters and self.active < self.limit:
+            waiter = max(self._waiters, key=lambda w: (w.priority, -w.seq))
+            self._waiters.remove(waiter)
+            self.active += 1
+            self.stats["admitted"] += 1
+            waiter.future.set_result(None)
+
+
+controller = AdmissionController(int(MCP_MAX_CONCURRENT_CALLS or 16), int(MCP_MAX_QUEUED_CALLS or 32))
+
+
+def configure(max_concurrent: int, max_queued: int) -> None:
+    """Set the server's default limits; MCP_MAX_CONCURRENT_CALLS and MCP_MAX_QUEUED_CALLS take precedence."""
+    controller.limit = int(MCP_MAX_CONCURRENT_CALLS or max_concurrent)
+    controller.max_queue = int(MCP_MAX_QUEUED_CALLS or max_queued)
+
+
+@asynccontextmanager
+async def admitted(meta: dict):
+    """
+    Admit a tool call and run it under the caller's deadline.
+
+    Raises Overloaded when the call is shed and DeadlineExceeded when the
+    deadline passes while queued or running; the running call is cancelled
+    at its next await, and blocking code sees it through check_deadline().
+    """
+    deadline = parse_deadline(meta)
+    priority = parse_priority(meta)
+    async with controller.slot(priority, deadline):
+        with deadline_scope(deadline):
+            try:
+                async with asyncio.timeout(None if deadline is None else deadline - time.monotonic()):
+                    yield
+            except TimeoutError:
+                controller.stats["expired"] += 1
+                raise DeadlineExceeded("Deadline passed while the call was running") from None
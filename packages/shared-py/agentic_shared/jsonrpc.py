@@ -0,0 +1,104 @@
+"""JSON-RPC 2.0 serialization helpers using orjson"""
+import dataclasses
+import json
+import re
+from typing import Any, Iterator, Union
+import orjson
+from starlette.responses import Response, StreamingResponse
+
+
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+JSONDecodeError = orjson.JSONDecodeError
+
+# orjson reads integers outside the 64-bit range as floats. Any 19-digit run may
+# be one (strings are matched too, which only costs a slower parse).
+_WIDE_INT_BYTES = re.compile(rb"\d{19}")
+_WIDE_INT_TEXT = re.compile(r"\d{19}")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    obj = orjson.loads(data)
+    wide_int = _WIDE_INT_TEXT if isinstance(data, str) else _WIDE_INT_BYTES
+    if wide_int.search(data):
+        # Already validated by orjson, so this cannot raise
+        return json.loads(data)
+    return obj
+
+
+def _fallback_default(obj: Any) -> Any:
+    # What orjson serializes natively but the json module does not
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_fallback(obj: Any) -> str:
+    # orjson rejects integers wider than 64 bits; the json module does not
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_fallback_default)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes (non-ASCII is not escaped)."""
+    try:
+        return orjson.dumps(obj, option=_DUMPS_OPTIONS)
+    except orjson.JSONEncodeError:
+        return _dumps_fallback(obj).encode("utf-8")
+
+
+def dumps_text(obj: Any) -> str:
+    """Serialize to a JSON string, e.g. for TextContent.text."""
+    try:
+        return orjson.dumps(obj, option=_DUMPS_OPTIONS).decode("utf-8")
+    except orjson.JSONEncodeError:
+        return _dumps_fallback(obj)
+
+
+def result_body(request_id: Any, result: Union[bytes, Any]) -> bytes:
+    """Build a JSON-RPC result envelope. *result* may already be serialized bytes."""
+    if not isinstance(result, bytes):
+        result = dumps(result)
+    return b'{"jsonrpc":"2.0","id":' + dumps(request_id) + b',"result":' + result + b"}"
+
+
+def result_chunks(request_id: Any, result: list[bytes]) -> list[bytes]:
+    """Like result_body, for a result serialized as chunks; the chunks are not joined."""
+    return [b'{"jsonrpc":"2.0","id":' + dumps(request_id) + b',"result":', *result, b"}"]
+
+
+def body_chunks(body: Union[bytes, list[bytes]]) -> Iterator[bytes]:
+    """Iterate a response body that is either bytes or a list of chunks."""
+    if isinstance(body, bytes):
+        yield body
+    else:
+        yield from body
+
+
+def error_body(request_id: Any, code: int, message: str) -> bytes:
+    return dumps({"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}})
+
+
+class JSONRPCResponse(Response):
+    """JSON response whose content is encoded once with orjson (or passed through as bytes)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+async def _iterate(chunks: list[bytes]):
+    for chunk in chunks:
+        yield chunk
+
+
+class JSONRPCChunkedResponse(StreamingResponse):
+    """JSON response written chunk by chunk from a list of byte strings, which are never joined."""
+
+    media_type = "application/json"
+
+    def __init__(self, chunks: list[bytes], status_code: int = 200):
+        super().__init__(_iterate(chunks), status_code=status_code,
+                         headers={"Content-Length": str(sum(len(chunk) for chunk in chunks))})
@@ -0,0 +1,214 @@
+"""On-demand sampling profiler and slow tool-call captures for the live process"""
+import asyncio
+import cProfile
+import hmac
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from agentic_shared import jsonrpc
+
+
+# Debug routes are disabled unless a bearer token is configured
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", 60))
+SLOW_CALL_MS = float(os.environ.get("SLOW_CALL_MS", 5000))
+SLOW_CALL_HISTORY = int(os.environ.get("SLOW_CALL_HISTORY", 50))
+
+# Stage timings kept per call; tools may mark one per item (fetch_many marks every page), so cap them
+_MAX_STAGES = 64
+_MAX_ARGUMENTS_CHARS = 500
+# Argument keys whose values are not kept in captures; all values of a
+# "headers" argument are dropped too, since any header can carry credentials
+_SECRET_KEY_RE = re.compile(r"authorization|cookie|token|key(?![a-z])|secret|passw", re.IGNORECASE)
+# The same for secret-looking query parameters in URLs
+_SECRET_QUERY_RE = re.compile(r"([?&][^=&#]*(?:authorization|token|key(?![a-z])|secret|passw)[^=&#]*=)[^&#]*", re.IGNORECASE)
+_REDACTED = "[redacted]"
+
+# (file, function) of Python frames where a thread is parked waiting for work
+_IDLE_LEAVES = frozenset({
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+})
+
+
+class ProfilerBusy(Exception):
+    """Another profile of this process is already running."""
+
+
+def authorized(authorization: str) -> bool:
+    """Check an Authorization header against PROFILE_TOKEN (always False when unset)."""
+    if not PROFILE_TOKEN:
+        return False
+    scheme, _, token = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), PROFILE_TOKEN.encode())
+
+
+# ---------------------------------------------------------------------------
+# Sampling profiler
+# ---------------------------------------------------------------------------
+
+_profile_lock = asyncio.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_LEAVES
+
+
+def sample_stacks(seconds: float, interval: float, include_idle: bool = False) -> tuple[Counter, int]:
+    """
+    Sample the Python stacks of all threads every *interval* seconds.
+
+    Returns a Counter of collapsed stacks (root first, ';'-separated, prefixed
+    with the thread name) and the number of sampling rounds taken. Nothing is
+    installed in the interpreter, so other threads run unaffected apart from
+    the GIL hand-offs of the sampler itself.
+    """
+    own = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    stacks: Counter = Counter()
+    rounds = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (not include_idle and _is_idle(frame)):
+                continue
+            if ident not in names:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks[";".join(reversed(labels))] += 1
+        rounds += 1
+        time.sleep(interval)
+    return stacks, rounds
+
+
+def collapse(stacks: Counter) -> str:
+    """Render stacks in the collapsed format read by flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+async def _profile_event_loop(seconds: float) -> bytes:
+    # cProfile hooks the current thread only, i.e. the event loop and every
+    # coroutine it runs while we sleep; worker threads are not included.
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+async def run_profile(seconds: float, format: str = "collapsed", interval: float = 0.005,
+                      include_idle: bool = False) -> bytes:
+    """
+    Profile the live process for *seconds*.
+
+    format="collapsed" samples all threads and returns collapsed stacks;
+    format="pstats" returns a binary pstats dump of the event loop thread
+    (load it with `python -m pstats` or snakeviz). Only one profile runs at a
+    time; ProfilerBusy is raised otherwise.
+    """
+    if _profile_lock.locked():
+        raise ProfilerBusy("A profile is already running")
+    async with _profile_lock:
+        print(f"[Profile] {format} for {seconds}s", flush=True)
+        if format == "pstats":
+            return await _profile_event_loop(seconds)
+        stacks, rounds = await asyncio.to_thread(sample_stacks, seconds, interval, include_idle)
+        print(f"[Profile] {rounds} samples, {len(stacks)} distinct stacks", flush=True)
+        return collapse(stacks).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Slow tool-call captures
+# ---------------------------------------------------------------------------
+
+class _CallTrace:
+    __slots__ = ("started_at", "start", "stages")
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.stages: list[dict] = []
+
+
+_current_call: ContextVar[Optional[_CallTrace]] = ContextVar("profiling_call", default=None)
+
+slow_calls: deque = deque(maxlen=SLOW_CALL_HISTORY)
+call_stats = {"calls": 0, "slow": 0}
+
+
+def mark_stage(name: str) -> None:
+    """Record a stage boundary of the current tool call (no-op outside one)."""
+    trace = _current_call.get()
+    if trace is None or len(trace.stages) >= _MAX_STAGES:
+        return
+    trace.stages.append({"stage": name, "at_ms": round((time.perf_counter() - trace.start) * 1000, 2)})
+
+
+def redact(value, secret: bool = False):
+    """Copy of tool arguments without credentials, for slow-call captures."""
+    if isinstance(value, dict):
+        return {
+            k: redact(v, secret or (isinstance(k, str) and (k.lower() == "headers" or _SECRET_KEY_RE.search(k) is not None)))
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v, secret) for v in value]
+    if secret:
+        return _REDACTED
+    if isinstance(value, str) and "=" in value:
+        return _SECRET_QUERY_RE.sub(rf"\1{_REDACTED}", value)
+    return value
+
+
+@contextmanager
+def trace_call(tool: str, arguments: dict):
+    """Time a tool call; calls over SLOW_CALL_MS are kept with their stage timings."""
+    trace = _CallTrace()
+    token = _current_call.set(trace)
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        _current_call.reset(token)
+        elapsed = (time.perf_counter() - trace.start) * 1000
+        call_stats["calls"] += 1
+        if elapsed >= SLOW_CALL_MS:
+            call_stats["slow"] += 1
+            print(f"[Profile] Slow call: {tool} took {elapsed:.2f}ms", flush=True)
+            capture = {
+                "tool": tool,
+                "started_at": datetime.fromtimestamp(trace.started_at, timezone.utc).isoformat(timespec="milliseconds"),
+                "duration_ms": round(elapsed, 2),
+                "arguments": jsonrpc.dumps_text(redact(arguments))[:_MAX_ARGUMENTS_CHARS],
+                "stages": trace.stages,
+            }
+            if error is not None:
+                capture["error"] = error
+            slow_calls.append(capture)
@@ -0,0 +1,84 @@
+"""Progress notifications for long-running tool calls"""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from agentic_shared import profiling
+
+
+# Receives the params of a notifications/progress message (without progressToken).
+# Tools run partly in worker threads; asyncio.to_thread copies this context, so
+# reporters must be safe to call from any thread.
+ProgressReporter = Callable[[dict], None]
+
+_reporter: ContextVar[Optional[ProgressReporter]] = ContextVar("progress_reporter", default=None)
+
+
+def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None,
+                    partial: Any = None) -> None:
+    """Emit a progress update for the current tool call; a no-op when nobody listens."""
+    if message is not None:
+        # Progress messages double as stage markers for slow-call captures
+        profiling.mark_stage(message)
+    reporter = _reporter.get()
+    if reporter is None:
+        return
+    params: dict = {"progress": progress}
+    if total is not None:
+        params["total"] = total
+    if message is not None:
+        params["message"] = message
+    if partial is not None:
+        # Early partial content, e.g. one finished page of a fetch_many call
+        params["partial"] = partial
+    reporter(params)
+
+
+@contextmanager
+def reporting_to(reporter: Optional[ProgressReporter]):
+    token = _reporter.set(reporter)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+def progress_notification(progress_token: Any, params: dict) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "method": "notifications/progress",
+        "params": {"progressToken": progress_token, **params}
+    }
+
+
+def queue_reporter(queue: asyncio.Queue, progress_token: Any) -> ProgressReporter:
+    """Reporter that feeds notifications into *queue* from any thread."""
+    loop = asyncio.get_running_loop()
+
+    def reporter(params: dict) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, progress_notification(progress_token, params))
+
+    return reporter
+
+
+def session_reporter(server) -> Optional[ProgressReporter]:
+    """Reporter for calls arriving through the MCP SDK transport (/sse), if the client asked for progress."""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+    progress_token = ctx.meta.progressToken if ctx.meta else None
+    if progress_token is None:
+        return None
+    loop = asyncio.get_running_loop()
+
+    def send(params: dict) -> None:
+        asyncio.ensure_future(ctx.session.send_progress_notification(
+            progress_token, params["progress"], params.get("total"), params.get("message")
+        ))
+
+    def reporter(params: dict) -> None:
+        loop.call_soon_threadsafe(send, params)
+
+    return reporter
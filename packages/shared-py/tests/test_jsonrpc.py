@@ -0,0 +1,28 @@
+from agentic_shared import jsonrpc
+
+
+WIDE_ID = 12345678901234567890123
+
+
+def test_loads_keeps_wide_integer_ids():
+    request = jsonrpc.loads(b'{"jsonrpc":"2.0","id":12345678901234567890123,"method":"ping"}')
+    assert request["id"] == WIDE_ID
+    assert isinstance(request["id"], int)
+
+
+def test_wide_request_id_round_trips():
+    request = jsonrpc.loads('{"jsonrpc":"2.0","id":12345678901234567890123,"method":"ping"}')
+
+    result = jsonrpc.loads(jsonrpc.result_body(request["id"], {}))
+    error = jsonrpc.loads(jsonrpc.error_body(request["id"], -32601, "Method not found"))
+
+    assert result == {"jsonrpc": "2.0", "id": WIDE_ID, "result": {}}
+    assert error["id"] == WIDE_ID
+
+
+def test_loads_matches_orjson_for_ordinary_documents():
+    data = b'{"id":7,"params":{"n":9223372036854775807,"x":1.5,"s":"12345678901234567890123"}}'
+    assert jsonrpc.loads(data) == {
+        "id": 7,
+        "params": {"n": 9223372036854775807, "x": 1.5, "s": "12345678901234567890123"},
+    }